@@ -0,0 +1,250 @@
+"""Headless position analysis, streaming positions in and JSON lines out
+
+    Each input line is a position: the columns played from the empty board
+    ("3342", player 1 first), or a JSON object with an optional "id" and
+    either "moves" (a string or list of columns) or "board" (rows top
+    first, "." for empty cells and "1"/"2" for pieces; "player" to move
+    defaults to whoever has fewer pieces). Each output line is a JSON object with the id (the input line
+    number when not given), the player to move, the best column, a score
+    per open column from the mover's point of view and search statistics.
+    Positions with at most --solver-threshold empty cells are solved
+    exactly ("solved": true, scores are solver scores: 0 for a draw,
+    positive for a win, larger the sooner); the others are searched and
+    scored by mean playout result (-1 loss to 1 win). Lines that cannot be
+    analysed give {"id", "error"}.
+
+    Results are written in input order. Positions are spread over a process
+    pool with at most --in-flight of them outstanding, so memory stays flat
+    however long the input is.
+    Run from the project root:
+    python Selected/analyze_positions.py positions.txt > analysis.jsonl
+    python Selected/analyze_positions.py --iterations 5000 --workers 4 < positions.txt"""
+import argparse
+import json
+import os
+import random
+import sys
+from collections import deque
+from multiprocessing import Pool
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from game_layer import GameLayer, BOARD_WIDTH, BOARD_HEIGHT, WIN_LENGTH
+from game_session_layer import monte_carlo_search, other, DEFAULT_ITERATIONS, DEFAULT_SOLVER_THRESHOLD, PLAYER_1
+from solver import Solver
+
+IN_FLIGHT_PER_WORKER = 4  # positions queued per worker, enough to keep workers busy
+
+_solvers = {}  # one solver per board size in each worker process, reusing its table
+
+
+class AnalysisSettings:
+    """Data transfer object that describes how positions are analysed"""
+    def __init__(self,
+                 width: int = BOARD_WIDTH,
+                 height: int = BOARD_HEIGHT,
+                 win_length: int = WIN_LENGTH,
+                 iterations: int | None = DEFAULT_ITERATIONS,
+                 time_budget: float | None = None,
+                 solver_threshold: int | None = DEFAULT_SOLVER_THRESHOLD):
+        self.width = width
+        self.height = height
+        self.win_length = win_length
+        self.iterations = iterations  # search limits, as for monte_carlo_search
+        self.time_budget = time_budget
+        self.solver_threshold = solver_threshold  # empty cells at which positions are solved, None never
+
+
+def parse_position(line: str, settings: AnalysisSettings) -> tuple[str | None, GameLayer, int]:
+    """Returns the id (None if not given), game and player to move for an input line"""
+    line = line.strip()
+    if line.startswith("{"):
+        record = json.loads(line)
+    else:
+        record = {"moves": line}
+
+    game = GameLayer(settings.width, settings.height, settings.win_length)
+    if "moves" in record:
+        # a string of single-digit columns, or a list of columns for wider boards
+        moves = record["moves"]
+        player = PLAYER_1
+        for x in moves:
+            if isinstance(moves, str):
+                x = int(x) if x.isdigit() else x
+            if x not in game.open_moves:
+                raise Exception(f"Illegal move {x}")
+            game.move(player, x)
+            player = other(player)
+    elif "board" in record:
+        player = _load_board(game, record["board"])
+    else:
+        raise Exception("Position has neither moves nor board")
+
+    player = record.get("player", player)
+    if player not in (1, 2):
+        raise Exception(f"Bad player {player}")
+    return record.get("id"), game, player
+
+
+def _load_board(game: GameLayer, rows: list[str]) -> int:
+    """Plays the pieces of a board given as rows (top first) into game
+        Returns the player to move: the one with fewer pieces, player 1 on a tie"""
+    if len(rows) != game.height or any(len(row) != game.width for row in rows):
+        raise Exception(f"Board is not {game.width}x{game.height}")
+
+    counts = {1: 0, 2: 0}
+    for x in range(game.width):
+        column = [row[x] for row in reversed(rows)]  # bottom up
+        for y, cell in enumerate(column):
+            if cell == ".":
+                if any(above != "." for above in column[y:]):
+                    raise Exception(f"Floating piece in column {x}")
+                break
+            if cell not in "12":
+                raise Exception(f"Bad cell {cell}")
+            game.move(int(cell), x)
+            counts[int(cell)] += 1
+
+    if not 0 <= counts[1] - counts[2] <= 1:
+        raise Exception("Piece counts are not from alternating moves")
+    return PLAYER_1 if counts[1] == counts[2] else other(PLAYER_1)
+
+
+def analyze_position(game: GameLayer, player: int, settings: AnalysisSettings) -> dict:
+    """Returns the analysis of game with player to move (see the module docstring)"""
+    if game.is_over:
+        raise Exception("Game is over")
+
+    empty = game.width * game.height - game.move_count
+    if settings.solver_threshold is not None and empty <= settings.solver_threshold:
+        return _solve_columns(game, player)
+
+    result = monte_carlo_search(game, player, iterations=settings.iterations, time_budget=settings.time_budget)
+    return {
+        "player": player,
+        "best_move": result.move,
+        "scores": {x: stat["u"] / stat["n"] for x, stat in result.stats.items() if stat["n"]},
+        "visits": {x: stat["n"] for x, stat in result.stats.items()},
+        "iterations": result.iterations,
+        "elapsed": result.elapsed,
+        "solved": False,
+    }
+
+
+def _solve_columns(game: GameLayer, player: int) -> dict:
+    """Solves every open column of game; returns the analysis"""
+    size = (game.width, game.height, game.win_length)
+    if size not in _solvers:
+        _solvers[size] = Solver(*size)
+    solver = _solvers[size]
+
+    scores = {}
+    nodes = 0
+    elapsed = 0.0
+    moves = game.move_count
+    for x in list(game.open_moves):
+        game.push(player, x)
+        if game.winner == player:
+            scores[x] = (game.width * game.height + 1 - moves) // 2  # the solver's score for a win now
+        elif game.is_draw:
+            scores[x] = 0
+        else:
+            solved = solver.solve(game, other(player))
+            scores[x] = -solved.score
+            nodes += solved.nodes
+            elapsed += solved.elapsed
+        game.pop()
+
+    return {
+        "player": player,
+        "best_move": max(scores, key=scores.get),
+        "scores": scores,
+        "nodes": nodes,
+        "elapsed": elapsed,
+        "solved": True,
+    }
+
+
+def analyze_line(job: tuple[int, str, AnalysisSettings, int]) -> dict:
+    """Process pool entry point, returns the output record of one input line
+        job is (line number, line, settings, seed)"""
+    number, line, settings, seed = job
+    random.seed(seed)
+    np.random.seed(seed)
+
+    position_id = number
+    try:
+        given_id, game, player = parse_position(line, settings)
+        if given_id is not None:
+            position_id = given_id
+        return {"id": position_id, **analyze_position(game, player, settings)}
+    except Exception as e:  # bad input is reported per line, not fatal
+        return {"id": position_id, "error": str(e)}
+
+
+def analyze_stream(lines: Iterable[str],
+                   settings: AnalysisSettings,
+                   workers: int = 1,
+                   in_flight: int | None = None,
+                   seed: int = 0) -> Iterator[dict]:
+    """Yields the output record of every non-blank line, in input order
+        With workers > 1 lines are analysed on a process pool, reading
+        ahead at most in_flight lines (by default IN_FLIGHT_PER_WORKER per
+        worker). Position n is searched with seed + n"""
+    jobs = ((number, line, settings, seed + number)
+            for number, line in enumerate(lines, 1) if line.strip())
+
+    if workers <= 1:
+        for job in jobs:
+            yield analyze_line(job)
+        return
+
+    in_flight = in_flight or workers * IN_FLIGHT_PER_WORKER
+    with Pool(workers) as pool:
+        pending = deque()
+        for job in jobs:
+            if len(pending) >= in_flight:
+                yield pending.popleft().get()
+            pending.append(pool.apply_async(analyze_line, (job,)))
+        while pending:
+            yield pending.popleft().get()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", nargs="?", help="positions file, standard input if not given")
+    parser.add_argument("--output", help="JSON lines file, standard output if not given")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS, help="search iterations per position")
+    parser.add_argument("--time-budget", type=float, help="search seconds per position, instead of iterations")
+    parser.add_argument("--solver-threshold", type=int, default=DEFAULT_SOLVER_THRESHOLD,
+                        help="solve positions with at most this many empty cells (-1 never)")
+    parser.add_argument("--width", type=int, default=BOARD_WIDTH)
+    parser.add_argument("--height", type=int, default=BOARD_HEIGHT)
+    parser.add_argument("--win-length", type=int, default=WIN_LENGTH, help="tokens in a line needed to win")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--in-flight", type=int, help="most positions read ahead of the output")
+    parser.add_argument("--seed", type=int, default=7319)
+    args = parser.parse_args()
+
+    settings = AnalysisSettings(width=args.width,
+                                height=args.height,
+                                win_length=args.win_length,
+                                iterations=None if args.time_budget is not None else args.iterations,
+                                time_budget=args.time_budget,
+                                solver_threshold=None if args.solver_threshold < 0 else args.solver_threshold)
+
+    source = sys.stdin if args.input is None else open(args.input)
+    sink = sys.stdout if args.output is None else open(args.output, "w")
+    try:
+        for record in analyze_stream(source, settings, args.workers, args.in_flight, args.seed):
+            sink.write(json.dumps(record) + "\n")
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+
+if __name__ == "__main__":
+    main()
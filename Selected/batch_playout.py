@@ -0,0 +1,95 @@
+import numpy as np
+
+from game_layer import GameLayer, run_shifts
+
+
+BATCH_MAX_BITS = 64  # the games are held in uint64 bitboards
+
+
+def fits_batch(game_layer: GameLayer) -> bool:
+    """Returns whether game_layer's board fits the batched bitboards"""
+    return game_layer.width * (game_layer.height + 1) <= BATCH_MAX_BITS
+
+
+def batch_simulate(game_layer: GameLayer, player: int, x: int, count: int) -> np.ndarray:
+    """Plays x for player, then count independent random games to the end
+        Returns each game's utility for player (1 win, -1 loss, 0 draw) as
+        simulate() would score it. The games are advanced together one ply
+        at a time on uint64 bitboards; game_layer is left unchanged"""
+    if not fits_batch(game_layer):
+        raise Exception("Board is too large for batched playouts")
+
+    depth = 0
+    if not game_layer.is_over:  # applies move if board has open moves
+        game_layer.push(player, x)
+        depth += 1
+
+    try:
+        if game_layer.is_over:
+            utility = 0 if game_layer.is_draw else (1 if game_layer.winner == player else -1)
+            return np.full(count, utility, dtype=np.int8)
+
+        return _random_games(game_layer, player, count)
+    finally:
+        for _ in range(depth):
+            game_layer.pop()
+
+
+def _random_games(game_layer: GameLayer, player: int, count: int) -> np.ndarray:
+    """Plays count random games from game_layer, where player has just moved"""
+    width, height = game_layer.width, game_layer.height
+    stride = height + 1
+    # vertical, horizontal, diagonal (/), diagonal (\)
+    line_shifts = [run_shifts(shift, game_layer.win_length) for shift in (1, stride, stride + 1, stride - 1)]
+
+    p1, p2 = game_layer.bitboards
+    occupied = p1 | p2
+    column = (1 << stride) - 1
+    start_heights = [(occupied >> (c * stride) & column).bit_length() for c in range(width)]
+
+    utility = np.zeros(count, dtype=np.int8)  # games never decided are draws
+
+    # state of the games still being played; finished games are dropped
+    games = np.arange(count)
+    mine = np.full(count, p1 if player == 1 else p2, dtype=np.uint64)
+    theirs = np.full(count, p2 if player == 1 else p1, dtype=np.uint64)
+    heights = np.tile(np.array(start_heights, dtype=np.int64), (count, 1))
+
+    my_turn = False  # player has just moved
+    for _ in range(width * height - game_layer.move_count):
+        rows = np.arange(len(games))
+
+        # pick a random open column in every game
+        scores = np.where(heights < height, np.random.random(heights.shape), -1.0)
+        choice = scores.argmax(axis=1)
+        bits = np.left_shift(np.uint64(1), (choice * stride + heights[rows, choice]).astype(np.uint64))
+        heights[rows, choice] += 1
+
+        if my_turn:
+            mine |= bits
+            won = _has_line(mine, line_shifts)
+        else:
+            theirs |= bits
+            won = _has_line(theirs, line_shifts)
+
+        if won.any():
+            utility[games[won]] = 1 if my_turn else -1
+            playing = ~won
+            games, mine, theirs, heights = games[playing], mine[playing], theirs[playing], heights[playing]
+            if len(games) == 0:
+                break
+
+        my_turn = not my_turn
+
+    return utility
+
+
+def _has_line(masks: np.ndarray, line_shifts: list[tuple[int, ...]]) -> np.ndarray:
+    """Returns which bitboards hold a winning line (see Board.has_line)"""
+    found = np.zeros(len(masks), dtype=bool)
+    for shifts in line_shifts:
+        run = masks
+        for shift in shifts:
+            run = run & (run >> np.uint64(shift))
+        found |= run != 0
+    return found
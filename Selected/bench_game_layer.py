@@ -0,0 +1,168 @@
+"""Compares the bitboard GameLayer against the previous numpy grid implementation
+
+    Run from the project root: python Selected/bench_game_layer.py"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from game_layer import GameLayer, UNOCCUPIED
+from game_session_layer import simulate, other, PLAYER_2
+from batch_playout import batch_simulate
+
+
+class NumpyBoard:
+    """Reference copy of the numpy grid board that GameLayer used to wrap"""
+    def __init__(self, grid):
+        self.grid = grid
+        self.width = len(grid[0])
+        self.height = len(grid)
+
+    def copy(self):
+        return NumpyBoard(np.copy(self.grid))
+
+
+class NumpyGameLayer:
+    """Reference copy of the numpy grid GameLayer, kept for comparison only"""
+
+    def __init__(self):
+        self._board = NumpyBoard(np.full((6, 7), UNOCCUPIED, dtype=int))
+        self._winner = None
+
+    @property
+    def winner(self):
+        return self._winner
+
+    @property
+    def is_draw(self):
+        all_occupied = np.count_nonzero(self._board.grid == UNOCCUPIED) == 0
+        return self._winner is None and all_occupied
+
+    @property
+    def is_over(self):
+        return self._winner is not None or self.is_draw
+
+    @property
+    def open_moves(self):
+        return [x for x in range(self._board.width)
+                if np.count_nonzero(self._board.grid[:, x] == UNOCCUPIED) > 0]
+
+    def move(self, player, x):
+        if self.is_over:
+            raise Exception("Game is over")
+        if np.count_nonzero(self._board.grid[:, x] == UNOCCUPIED) == 0:
+            raise Exception("Illegal move")
+
+        grid = self._board.grid
+        y = np.where(grid[:, x] == UNOCCUPIED)[0][-1]
+        grid[y, x] = player
+
+        width, height = self._board.width, self._board.height
+        rows = [
+            [grid[y, i] for i in range(max(0, x - 4), min(x + 4, width))],
+            [grid[j, x] for j in range(max(0, y - 4), min(y + 4, height))],
+            [grid[y + n, x + n] for n in range(-4, 5)
+             if 0 <= x + n < width and 0 <= y + n < height],
+            [grid[y - n, x + n] for n in range(-4, 5)
+             if 0 <= x + n < width and 0 <= y - n < height],
+        ]
+        for row in rows:
+            if self._winner is not None:
+                break
+            if len(row) < 4 or row[len(row) // 2] != player:
+                continue
+            num_adjacent = 0
+            for n in row:
+                num_adjacent = num_adjacent + 1 if n == player else 0
+                if num_adjacent >= 4:
+                    self._winner = player
+                    break
+        return y
+
+    def simulate_move(self, player, x):
+        game_copy = NumpyGameLayer()
+        game_copy._winner = self._winner
+        game_copy._board = self._board.copy()
+        if not game_copy.is_over:
+            game_copy.move(player, x)
+        return game_copy
+
+
+def numpy_simulate(game_layer, player, x):
+    """Reference copy of the copy-per-ply playout the numpy engine used"""
+    the_player = player
+    p_game = game_layer.simulate_move(the_player, x)
+    while not p_game.is_over:
+        all_actions = p_game.open_moves
+        next_action = all_actions[np.random.randint(len(all_actions))]
+        the_player = other(the_player)
+        p_game = p_game.simulate_move(the_player, next_action)
+    return 1 if p_game.winner == player else -1
+
+
+def bench_moves(game_class, games: int, seed: int) -> float:
+    """Plays random games through move(), returns moves per second"""
+    rng = random.Random(seed)
+    moves = 0
+    start = time.perf_counter()
+    for _ in range(games):
+        game = game_class()
+        player = 1
+        while not game.is_over:
+            game.move(player, rng.choice(game.open_moves))
+            player = 3 - player
+            moves += 1
+    return moves / (time.perf_counter() - start)
+
+
+def bench_playouts(game_class, playout, playouts: int, seed: int) -> float:
+    """Runs playouts from the empty board, returns playouts per second"""
+    np.random.seed(seed)
+    game = game_class()
+    start = time.perf_counter()
+    for i in range(playouts):
+        playout(game, PLAYER_2, i % 7)
+    return playouts / (time.perf_counter() - start)
+
+
+def bench_batched_playouts(playouts: int, batch: int, seed: int) -> float:
+    """Runs batch_simulate() playouts from the empty board, returns playouts per second"""
+    np.random.seed(seed)
+    game = GameLayer()
+    batches = max(1, playouts // batch)
+    start = time.perf_counter()
+    for i in range(batches):
+        batch_simulate(game, PLAYER_2, i % 7, batch)
+    return batches * batch / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--playouts", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=256, help="games per batch_simulate() call")
+    parser.add_argument("--seed", type=int, default=7319)
+    args = parser.parse_args()
+
+    results = {}
+    engines = (("numpy", NumpyGameLayer, numpy_simulate),
+               ("bitboard", GameLayer, simulate))
+    for name, game_class, playout in engines:
+        results[name] = (bench_moves(game_class, args.games, args.seed),
+                         bench_playouts(game_class, playout, args.playouts, args.seed))
+
+    print(f"{'engine':<10}{'moves/s':>14}{'playouts/s':>14}")
+    for name, (moves, playouts) in results.items():
+        print(f"{name:<10}{moves:>14,.0f}{playouts:>14,.0f}")
+
+    (np_moves, np_playouts), (bb_moves, bb_playouts) = results.values()
+    print(f"{'speedup':<10}{bb_moves / np_moves:>13.1f}x{bb_playouts / np_playouts:>13.1f}x")
+
+    batched = bench_batched_playouts(args.playouts * 10, args.batch, args.seed)
+    print(f"batched playouts (x{args.batch}): {batched:,.0f}/s "
+          f"({batched / bb_playouts:.1f}x bitboard)")
+
+
+if __name__ == "__main__":
+    main()
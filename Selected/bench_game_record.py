@@ -0,0 +1,87 @@
+"""Measures game record write, sequential read and random access throughput
+
+    A pool of random games is played once, then --games games drawn from
+    it are written to a temporary game record file, read back in order and
+    read at random game numbers through the index. Reports games/s, MB/s
+    and bytes per game.
+    Run from the project root: python Selected/bench_game_record.py --games 10000000"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from game_layer import GameLayer
+from game_record import GameRecordWriter, GameRecordReader, game_result, INDEX_SUFFIX
+
+SEED = 7319
+POOL_SIZE = 10000
+
+
+def random_games(count: int) -> list[tuple[list[int], int]]:
+    """Returns count random games as (columns played, result)"""
+    games = []
+    for _ in range(count):
+        game = GameLayer()
+        player = 1
+        moves = []
+        while not game.is_over:
+            moves.append(random.choice(game.open_moves))
+            game.move(player, moves[-1])
+            player = 3 - player
+        games.append((moves, game_result(game)))
+    return games
+
+
+def report(name: str, games: int, elapsed: float, size: int):
+    print(f"{name:<14}{games / elapsed:>14,.0f} games/s{size / elapsed / 1e6:>10.1f} MB/s{elapsed:>10.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", type=int, default=10_000_000)
+    parser.add_argument("--random-reads", type=int, default=1_000_000)
+    parser.add_argument("--dir", default=tempfile.gettempdir(), help="directory for the temporary file")
+    args = parser.parse_args()
+
+    random.seed(SEED)
+    pool = random_games(POOL_SIZE)
+    path = os.path.join(args.dir, f"bench_game_record_{os.getpid()}.bin")
+
+    try:
+        start = time.perf_counter()
+        with GameRecordWriter(path) as writer:
+            for n in range(args.games):
+                writer.write(*pool[n % POOL_SIZE])
+        write_elapsed = time.perf_counter() - start
+        size = os.path.getsize(path)
+        index_size = os.path.getsize(path + INDEX_SUFFIX)
+
+        reader = GameRecordReader(path)
+        start = time.perf_counter()
+        count = sum(1 for _ in reader)
+        read_elapsed = time.perf_counter() - start
+        if count != args.games:
+            raise Exception(f"Read {count} games, wrote {args.games}")
+
+        numbers = [random.randrange(args.games) for _ in range(args.random_reads)]
+        start = time.perf_counter()
+        for n in numbers:
+            reader[n]
+        random_elapsed = time.perf_counter() - start
+        reader.close()
+
+        print(f"{args.games:,} games, {size / args.games:.2f} bytes/game "
+              f"({sum(len(moves) for moves, _ in pool) / POOL_SIZE:.1f} moves/game), "
+              f"index {index_size / args.games:.0f} bytes/game")
+        report("write", args.games, write_elapsed, size + index_size)
+        report("read", args.games, read_elapsed, size)
+        report("random read", args.random_reads, random_elapsed, args.random_reads * size / args.games)
+    finally:
+        for file in (path, path + INDEX_SUFFIX):
+            if os.path.exists(file):
+                os.remove(file)
+
+
+if __name__ == "__main__":
+    main()
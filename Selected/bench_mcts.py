@@ -0,0 +1,83 @@
+"""Plays the tree search in monte_carlo_move against the previous flat (one-ply) search
+
+    Both searches get the same number of iterations per move and alternate
+    who moves first. Run from the project root: python Selected/bench_mcts.py"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+from game_layer import GameLayer
+from game_session_layer import (monte_carlo_move, simulate, ucb1, choose_best_action,
+                                other, PLAYER_1, PLAYER_2)
+
+
+def baseline_simulate(game_layer: GameLayer, player: int, x: int) -> int:
+    """simulate() with the previous scoring, which counted a draw as a loss (-1)"""
+    return simulate(game_layer, player, x) or -1
+
+
+def flat_monte_carlo_move(game_layer: GameLayer, player: int, iterations: int) -> int:
+    """Reference copy of the previous search: a UCB1 bandit over the root moves"""
+    root_n = 0
+    leafs = {move: {"u": 0, "n": 0} for move in game_layer.open_moves}
+    scratch = game_layer.copy()
+
+    for _ in range(iterations):
+        move = max(leafs, key=lambda m: ucb1(leafs[m]["u"], leafs[m]["n"], root_n))
+        leafs[move]["u"] += baseline_simulate(scratch, player, move)
+        leafs[move]["n"] += 1
+        root_n += 1
+
+    return choose_best_action(leafs)
+
+
+def play_game(agents: dict, first_player: int) -> int | None:
+    """Plays one game between agents ({player: search fn}), returns the winner"""
+    game = GameLayer()
+    player = first_player
+    while not game.is_over:
+        game.move(player, agents[player](game, player))
+        player = other(player)
+    return game.winner
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--games", type=int, default=40)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7319)
+    args = parser.parse_args()
+
+    def tree(game, player):
+        return monte_carlo_move(game, player, iterations=args.iterations)
+
+    def flat(game, player):
+        return flat_monte_carlo_move(game, player, iterations=args.iterations)
+
+    wins = draws = losses = 0
+    start = time.perf_counter()
+    for n in range(args.games):
+        np.random.seed(args.seed + n)
+        tree_player = PLAYER_1 if n % 2 == 0 else PLAYER_2
+        agents = {tree_player: tree, other(tree_player): flat}
+        winner = play_game(agents, first_player=PLAYER_1)
+
+        if winner is None:
+            draws += 1
+        elif winner == tree_player:
+            wins += 1
+        else:
+            losses += 1
+
+    score = (wins + 0.5 * draws) / args.games
+    margin = 1.96 * math.sqrt(score * (1 - score) / args.games)
+    print(f"tree vs flat, {args.iterations} iterations/move, {args.games} games "
+          f"({time.perf_counter() - start:.1f}s)")
+    print(f"wins {wins}  draws {draws}  losses {losses}")
+    print(f"tree score {score:.1%} +/- {margin:.1%}")
+
+
+if __name__ == "__main__":
+    main()
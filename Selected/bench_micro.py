@@ -0,0 +1,233 @@
+"""Microbenchmarks for the game rule and AI hot paths of both implementations
+
+    Each case runs on saved opening, middlegame and near-full positions with
+    fixed seeds and reports calls per second and peak bytes allocated per
+    call (tracemalloc). Results are compared to a saved baseline and cases
+    that got slower than --tolerance are flagged (exit status 1).
+    Run from the project root:
+    python Selected/bench_micro.py --save     record a baseline
+    python Selected/bench_micro.py            compare against it"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from game_layer import GameLayer
+from game_session_layer import monte_carlo_move, simulate, ucb1, other, PLAYER_1
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Unselected"))
+from Blackboard import Blackboard  # noqa: E402
+from MonteCarlo import MonteCarlo  # noqa: E402
+from MoveProcessor import MoveProcessor  # noqa: E402
+from MoveValidator import MoveValidator  # noqa: E402
+from WinCheck import WinChecker  # noqa: E402
+
+
+# columns played from the empty board, player 1 first; all quiet (see position_cases)
+POSITIONS = {
+    "opening": "3342",
+    "middlegame": "466053256140210004",
+    "near_full": "265364062410366241206402324100431331",
+}
+
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_micro_baseline.json")
+SEED = 7319
+MONTE_CARLO_ITERATIONS = 200
+
+
+def load_position(moves: str) -> tuple[GameLayer, int]:
+    """Returns the game after moves and the player to move"""
+    game = GameLayer()
+    player = PLAYER_1
+    for x in moves:
+        game.move(player, int(x))
+        player = other(player)
+    return game, player
+
+
+def create_blackboard(game: GameLayer, player: int, last_x: int) -> Blackboard:
+    """Returns a Blackboard holding the same position as game, last played in last_x"""
+    blackboard = Blackboard()
+    blackboard.board = game.grid.tolist()
+    blackboard.current_player = player
+    blackboard.move_count = game.move_count
+    blackboard.last_move = (top_row(blackboard, last_x), last_x)
+    return blackboard
+
+
+def top_row(blackboard: Blackboard, x: int) -> int:
+    """Returns the row of the top piece of column x"""
+    return next(row for row in range(len(blackboard.board)) if blackboard.board[row][x] != 0)
+
+
+def is_quiet(game: GameLayer, player: int, x: int) -> bool:
+    """Returns whether player cannot win at once, and after playing x the
+        game goes on and neither player can win on the next move"""
+    if can_win(game, player):
+        return False
+    game.push(player, x)
+    quiet = not game.is_over and not can_win(game, other(player)) and not can_win(game, player)
+    game.pop()
+    return quiet
+
+
+def can_win(game: GameLayer, player: int) -> bool:
+    """Returns whether player has a move that wins at once"""
+    for x in game.open_moves[:]:
+        game.push(player, x)
+        won = game.winner == player
+        game.pop()
+        if won:
+            return True
+    return False
+
+
+def position_cases(game: GameLayer, player: int, last_x: int) -> dict:
+    """Returns {case name: function of no arguments} for one position
+        The position must be quiet for the move timed, the open column
+        nearest the center: neither player can win on the next move before
+        or after it, so the cases time more than a one-ply game"""
+    center = len(game.grid[0]) // 2
+    x = min(game.open_moves, key=lambda move: abs(move - center))
+    if not is_quiet(game, player, x):
+        raise Exception(f"Position is not quiet for a move in column {x}")
+
+    def move():
+        game.move(player, x)
+        game.pop()
+
+    blackboard = create_blackboard(game, player, last_x)
+    validator = MoveValidator(blackboard)
+    processor = MoveProcessor(blackboard, validator)
+    win_checker = WinChecker(blackboard)
+    monte_carlo = MonteCarlo(blackboard)
+    state = monte_carlo.encode_board(blackboard.board)
+
+    def process_move():
+        before = blackboard.snapshot()
+        processor.process_move(x)
+        blackboard.update(board=before.board, last_move=before.last_move, move_count=before.move_count)
+
+    def random_playout():
+        monte_carlo.simulate_random_playouts(state[:], player)
+
+    return {
+        "GameLayer.move (+pop)": move,
+        "GameLayer.open_moves": lambda: game.open_moves,
+        "GameLayer.is_draw": lambda: game.is_draw,
+        "GameLayer.is_over": lambda: game.is_over,
+        "GameLayer.simulate_move": lambda: game.simulate_move(player, x),
+        "simulate": lambda: simulate(game, player, x),
+        f"monte_carlo_move ({MONTE_CARLO_ITERATIONS} it)":
+            lambda: monte_carlo_move(game, player, iterations=MONTE_CARLO_ITERATIONS),
+        "MoveValidator.is_move_valid": lambda: validator.is_move_valid(x),
+        "MoveProcessor.process_move (+undo)": process_move,
+        "WinChecker.check_winner": win_checker.check_winner,
+        "MonteCarlo.simulate_random_playouts (+copy)": random_playout,
+    }
+
+
+def all_cases() -> dict:
+    """Returns {(case name, position name): function} for every case"""
+    cases = {("ucb1", "-"): lambda: ucb1(12.5, 40, 300)}
+    for position, moves in POSITIONS.items():
+        game, player = load_position(moves)
+        for name, fn in position_cases(game, player, int(moves[-1])).items():
+            cases[name, position] = fn
+    return cases
+
+
+def ops_per_second(fn, min_time: float, repeats: int) -> float:
+    """Returns the best calls/s of repeats timings, each at least min_time long"""
+    calls = 1
+    while True:  # find a batch size that takes min_time
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        calls *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+    best = calls / elapsed
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        best = max(best, calls / (time.perf_counter() - start))
+    return best
+
+
+def bytes_per_call(fn, calls: int = 20) -> float:
+    """Returns the mean peak bytes allocated by one call"""
+    tracemalloc.start()
+    try:
+        total = 0
+        for _ in range(calls):
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            fn()
+            total += tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+    return total / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH)
+    parser.add_argument("--save", action="store_true", help="save the results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="slowdown flagged as a regression")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timing")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--filter", default="", help="only run cases whose name contains this")
+    args = parser.parse_args()
+
+    baseline = {}
+    if not args.save and os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    results = {}
+    regressions = 0
+    print(f"{'case':<46}{'position':<12}{'ops/s':>14}{'B/call':>10}{'vs base':>10}")
+    for (name, position), fn in all_cases().items():
+        if args.filter not in name:
+            continue
+
+        random.seed(SEED)
+        np.random.seed(SEED)
+        rate = ops_per_second(fn, args.min_time, args.repeats)
+        allocated = bytes_per_call(fn)
+
+        key = f"{name} @ {position}"
+        results[key] = {"ops_per_second": rate, "bytes_per_call": allocated}
+
+        line = f"{name:<46}{position:<12}{rate:>14,.0f}{allocated:>10,.0f}"
+        if key in baseline:
+            ratio = rate / baseline[key]["ops_per_second"]
+            line += f"{ratio:>9.2f}x"
+            if ratio < 1 - args.tolerance:
+                line += "  SLOWER"
+                regressions += 1
+        print(line)
+
+    if args.save:
+        with open(args.baseline, "w") as file:
+            json.dump(results, file, indent=2)
+        print(f"saved baseline to {args.baseline}")
+    elif baseline:
+        print(f"{regressions} case(s) slower than the baseline by more than {args.tolerance:.0%}")
+    else:
+        print(f"no baseline at {args.baseline}, run with --save to record one")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
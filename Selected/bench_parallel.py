@@ -0,0 +1,52 @@
+"""Measures root-parallel search throughput (playouts/s) by worker count
+
+    Run from the project root: python Selected/bench_parallel.py"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from game_layer import GameLayer
+from game_session_layer import SearchPool, PLAYER_1
+
+
+def bench_workers(workers: int, iterations: int, searches: int) -> float:
+    """Returns playouts per second for a pool of workers searching the empty board"""
+    pool = SearchPool(workers)
+    game = GameLayer()
+    try:
+        pool.search(game, PLAYER_1, 1)  # start worker processes outside the timing
+
+        playouts = 0
+        start = time.perf_counter()
+        for _ in range(searches):
+            playouts += pool.search(game, PLAYER_1, iterations)[1]
+        elapsed = time.perf_counter() - start
+    finally:
+        pool.close()
+
+    return playouts / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--iterations", type=int, default=2000, help="per worker, per search")
+    parser.add_argument("--searches", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7319)
+    args = parser.parse_args()
+
+    np.random.seed(args.seed)
+    print(f"{os.cpu_count()} CPUs, {args.iterations} iterations per worker per search")
+    print(f"{'workers':<10}{'playouts/s':>14}{'scaling':>10}")
+
+    baseline = None
+    for workers in args.workers:
+        rate = bench_workers(workers, args.iterations, args.searches)
+        baseline = baseline or rate
+        print(f"{workers:<10}{rate:>14,.0f}{rate / baseline:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
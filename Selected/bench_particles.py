@@ -0,0 +1,103 @@
+"""Measures the CPU time of the menu particle animation
+
+    Runs the previous animation, which deleted and recreated every particle
+    oval each frame, and the pooled ParticleAnimation on the 500x500 menu
+    canvas, each for --seconds with the window shown and then withdrawn.
+    Reports process CPU time as a share of wall-clock time and canvas items
+    created per second. Needs a display.
+    Run from the project root: python Selected/bench_particles.py"""
+import argparse
+import random
+import time
+import tkinter as tk
+
+from ui_layer import ParticleAnimation
+
+SEED = 7319
+MENU_SIZE = 500
+
+
+class LegacyParticles:
+    """Reference copy of the previous animate_particles, kept for comparison only"""
+    def __init__(self, root: tk.Tk):
+        self._root = root
+        self._canvas = None
+        self._after_id = None
+        self._particles = []
+
+    def attach(self, canvas: tk.Canvas, width: int, height: int):
+        self._canvas = canvas
+        self._after_id = self._root.after(30, self._tick)
+
+    def stop(self):
+        if self._after_id is not None:
+            self._root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _tick(self):
+        self._canvas.delete("particles")
+
+        if random.random() < 0.3:
+            x = random.randint(0, 400)
+            size = random.randint(1, 3)
+            color = random.choice(["#6666ff", "#8888ff", "#9999ff"])
+            self._particles.append([x, 0, size, color])
+
+        updated_particles = []
+        for x, y, r, color in self._particles:
+            y += 2
+            if y < 400:
+                self._canvas.create_oval(x - r, y - r, x + r, y + r, fill=color, outline='', tags="particles")
+                updated_particles.append([x, y, r, color])
+        self._particles = updated_particles
+
+        self._after_id = self._root.after(30, self._tick)
+
+
+def measure(root: tk.Tk, animation, seconds: float, shown: bool) -> dict[str, float]:
+    """Runs animation on a fresh menu canvas for seconds; returns CPU share and items created/s"""
+    random.seed(SEED)
+    for widget in root.winfo_children():
+        widget.destroy()
+    if shown:
+        root.deiconify()
+    else:
+        root.withdraw()
+
+    canvas = tk.Canvas(root, width=MENU_SIZE, height=MENU_SIZE, bg="black", highlightthickness=0)
+    canvas.pack()
+    root.update()
+
+    animation.attach(canvas, MENU_SIZE, MENU_SIZE)
+    # canvas item ids increase by one per created item
+    first_item = canvas.create_line(0, 0, 0, 0)
+
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    root.after(int(seconds * 1000), root.quit)
+    root.mainloop()
+    cpu, wall = time.process_time() - cpu_start, time.perf_counter() - wall_start
+
+    animation.stop()
+    last_item = canvas.create_line(0, 0, 0, 0)
+    return {
+        "cpu": cpu / wall,
+        "items/s": (last_item - first_item - 1) / wall,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=10.0, help="seconds per measurement")
+    args = parser.parse_args()
+
+    root = tk.Tk()
+    print(f"{'animation':<12}{'window':<10}{'CPU':>8}{'items created/s':>18}")
+    for name, create in (("previous", LegacyParticles), ("pooled", ParticleAnimation)):
+        for shown in (True, False):
+            result = measure(root, create(root), args.seconds, shown)
+            print(f"{name:<12}{'shown' if shown else 'hidden':<10}{result['cpu']:>8.1%}{result['items/s']:>18,.0f}")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""Measures how the rule and AI hot paths scale with board size and win length
+
+    For each board (width x height, win length) a quiet middlegame position
+    is reached with seeded random moves: neither player can win on the next
+    move, so no reply is forced and playouts do not end after a few plies.
+    Move generation, win detection, random playouts and search iterations
+    are then timed from it in both implementations, and the mean length of
+    a random playout is reported next to the playout rates.
+    A board is flagged as unusable when a search cannot reach
+    --min-iterations iterations in --move-time seconds, the AI's default
+    iteration count within a move time a player would accept.
+    Run from the project root:
+    python Selected/bench_scaling.py
+    python Selected/bench_scaling.py --boards 7x6/4 15x12/6"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+from batch_playout import batch_simulate, fits_batch
+from game_layer import Board, GameLayer
+from game_session_layer import monte_carlo_search, simulate, other, DEFAULT_ITERATIONS, PLAYER_1
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Unselected"))
+from Blackboard import Blackboard  # noqa: E402
+from MonteCarlo import MonteCarlo  # noqa: E402
+from WinCheck import WinChecker  # noqa: E402
+
+
+DEFAULT_BOARDS = ["7x6/4", "9x8/4", "9x8/5", "12x10/4", "12x10/5", "16x14/6"]
+SEED = 7319
+BATCH_SIZE = 256
+FILL = 1 / 3  # share of the board filled in the measured position
+PLIES_SAMPLES = 1000  # random playouts averaged for plies/playout
+
+
+def parse_board(spec: str) -> tuple[int, int, int]:
+    """Returns (width, height, win length) for a board given as WxH/N"""
+    try:
+        size, _, win_length = spec.partition("/")
+        width, height = size.split("x")
+        return int(width), int(height), int(win_length or 4)
+    except ValueError:
+        raise Exception(f"Bad board {spec}, expected WIDTHxHEIGHT/WIN_LENGTH")
+
+
+def quiet_middlegame(width: int, height: int, win_length: int) -> tuple[GameLayer, int, list[int]]:
+    """Returns a seeded random position with about FILL of the board played,
+        the player to move and the columns played
+        Every move is chosen among those after which neither player can win
+        on the next move"""
+    rng = random.Random(SEED)
+    while True:
+        game = GameLayer(width, height, win_length)
+        player = PLAYER_1
+        moves = []
+        while game.move_count < width * height * FILL:
+            choices = [x for x in game.open_moves if _is_quiet_after(game, player, x)]
+            if not choices:
+                break
+            moves.append(rng.choice(choices))
+            game.move(player, moves[-1])
+            player = other(player)
+        if game.move_count >= width * height * FILL:
+            return game, player, moves
+
+
+def _is_quiet_after(game: GameLayer, player: int, x: int) -> bool:
+    """Returns whether, after player plays x, the game goes on and neither player has a winning move"""
+    game.push(player, x)
+    quiet = not game.is_over and not _can_win(game, other(player)) and not _can_win(game, player)
+    game.pop()
+    return quiet
+
+
+def _can_win(game: GameLayer, player: int) -> bool:
+    """Returns whether player has a move that wins at once"""
+    for x in game.open_moves[:]:
+        game.push(player, x)
+        won = game.winner == player
+        game.pop()
+        if won:
+            return True
+    return False
+
+
+def playout_plies(game: GameLayer, player: int, x: int, count: int) -> float:
+    """Returns the mean number of plies of count random playouts as simulate() plays them"""
+    plies = 0
+    for _ in range(count):
+        depth = 0
+        the_player = player
+        game.push(the_player, x)
+        depth += 1
+        while not game.is_over:
+            open_moves = game.open_moves
+            the_player = other(the_player)
+            game.push(the_player, open_moves[np.random.randint(len(open_moves))])
+            depth += 1
+        for _ in range(depth):
+            game.pop()
+        plies += depth
+    return plies / count
+
+
+def rate(fn, min_time: float) -> float:
+    """Returns calls/s of fn over at least min_time seconds"""
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return calls / elapsed
+
+
+def measure(width: int, height: int, win_length: int, min_time: float, move_time: float) -> dict[str, float | None]:
+    """Returns the rates measured on one board; None where a path does not apply"""
+    game, player, moves = quiet_middlegame(width, height, win_length)
+    last_x = moves[-1]
+    board = Board(width, height, win_length)
+    for n, x in enumerate(moves):
+        board.apply_move(PLAYER_1 if n % 2 == 0 else other(PLAYER_1), x)
+    np.random.seed(SEED)
+    random.seed(SEED)
+
+    blackboard = Blackboard(height, width, win_length)
+    blackboard.board = game.grid.tolist()
+    blackboard.current_player = player
+    blackboard.move_count = game.move_count
+    top = next(row for row in range(height) if blackboard.board[row][last_x] != 0)
+    blackboard.last_move = (top, last_x)
+    win_checker = WinChecker(blackboard)
+    monte_carlo = MonteCarlo(blackboard)
+    state = monte_carlo.encode_board(blackboard.board)
+
+    def move_generation():
+        for x in game.open_moves[:]:
+            game.push(player, x)
+            game.pop()
+
+    x = game.open_moves[0]
+    results = {
+        "moves/s": rate(move_generation, min_time) * len(game.open_moves),
+        "win checks/s": rate(lambda: board.has_line(other(player)), min_time),
+        "blackboard win checks/s": rate(win_checker.check_winner, min_time),
+        "playouts/s": rate(lambda: simulate(game, player, x), min_time),
+        "plies/playout": playout_plies(game, player, x, PLIES_SAMPLES),
+        "batch playouts/s": None,
+        "blackboard playouts/s": rate(lambda: monte_carlo.simulate_random_playouts(state[:], player), min_time),
+    }
+    if fits_batch(game):
+        results["batch playouts/s"] = rate(lambda: batch_simulate(game, player, x, BATCH_SIZE),
+                                           min_time) * BATCH_SIZE
+
+    result = monte_carlo_search(game, player, iterations=None, time_budget=move_time)
+    results["search iterations/s"] = result.iterations / result.elapsed
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--boards", nargs="+", default=DEFAULT_BOARDS, help="boards as WIDTHxHEIGHT/WIN_LENGTH")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds spent timing each path")
+    parser.add_argument("--move-time", type=float, default=1.0, help="seconds a search may take per move")
+    parser.add_argument("--min-iterations", type=int, default=DEFAULT_ITERATIONS)
+    args = parser.parse_args()
+
+    boards = [parse_board(spec) for spec in args.boards]
+    names = [f"{width}x{height}/{win_length}" for width, height, win_length in boards]
+    results = [measure(*board, args.min_time, args.move_time) for board in boards]
+
+    # one row per path, one column per board
+    print(f"{'':<24}" + "".join(f"{name:>12}" for name in names))
+    for path in results[0]:
+        digits = 1 if path == "plies/playout" else 0
+        print(f"{path:<24}" + "".join(f"{'-' if r[path] is None else f'{r[path]:,.{digits}f}':>12}" for r in results))
+    print(f"{'usable':<24}" + "".join(
+        f"{'yes' if r['search iterations/s'] * args.move_time >= args.min_iterations else 'no':>12}"
+        for r in results))
+
+
+if __name__ == "__main__":
+    main()
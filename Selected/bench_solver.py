@@ -0,0 +1,51 @@
+"""Measures the endgame solver: nodes per second and solve time by empty cells
+
+    Positions are random games stopped with the given number of empty cells
+    (skipping finished games). Run from the project root:
+    python Selected/bench_solver.py"""
+import argparse
+import random
+import statistics
+
+from game_layer import GameLayer, BOARD_WIDTH, BOARD_HEIGHT
+from game_session_layer import other, PLAYER_1
+from solver import Solver
+
+
+def random_position(rng: random.Random, empty: int) -> tuple[GameLayer, int] | None:
+    """Returns a random unfinished position with empty cells left and the player to move"""
+    game = GameLayer()
+    player = PLAYER_1
+    while BOARD_WIDTH * BOARD_HEIGHT - game.move_count > empty:
+        if game.is_over:
+            return None
+        game.move(player, rng.choice(game.open_moves))
+        player = other(player)
+    return None if game.is_over else (game, player)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--empty", type=int, nargs="+", default=[6, 8, 10, 12, 14, 16])
+    parser.add_argument("--positions", type=int, default=20, help="per empty-cell count")
+    parser.add_argument("--seed", type=int, default=7319)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'empty':<7}{'mean ms':>10}{'max ms':>10}{'mean nodes':>12}{'nodes/s':>12}")
+    for empty in args.empty:
+        times, nodes = [], []
+        while len(times) < args.positions:
+            position = random_position(rng, empty)
+            if position is None:
+                continue
+            result = Solver().solve(*position)
+            times.append(result.elapsed)
+            nodes.append(result.nodes)
+
+        print(f"{empty:<7}{statistics.mean(times) * 1000:>10.1f}{max(times) * 1000:>10.1f}"
+              f"{statistics.mean(nodes):>12,.0f}{sum(nodes) / sum(times):>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
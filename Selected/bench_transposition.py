@@ -0,0 +1,78 @@
+"""Compares the Monte Carlo search with and without a transposition table
+
+    Reports search speed, table hit rate and memory use, and plays the two
+    configurations against each other at equal iterations per move.
+    Run from the project root: python Selected/bench_transposition.py"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+from bench_mcts import play_game
+from game_layer import GameLayer
+from game_session_layer import monte_carlo_search, other, PLAYER_1, PLAYER_2
+from transposition_table import TranspositionTable
+
+
+def bench_speed(iterations: int, searches: int, buckets: int | None, seed: int):
+    """Searches the empty board, returns (iterations/s, table or None)"""
+    np.random.seed(seed)
+    table = TranspositionTable(buckets) if buckets else None
+    game = GameLayer()
+
+    done = 0
+    start = time.perf_counter()
+    for _ in range(searches):
+        done += monte_carlo_search(game, PLAYER_1, iterations=iterations, table=table).iterations
+    return done / (time.perf_counter() - start), table
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--searches", type=int, default=5)
+    parser.add_argument("--games", type=int, default=40)
+    parser.add_argument("--buckets", type=int, default=1 << 15)
+    parser.add_argument("--seed", type=int, default=7319)
+    args = parser.parse_args()
+
+    print(f"{'table':<8}{'iterations/s':>14}{'hit rate':>10}{'entries':>10}{'evictions':>11}{'memory':>10}")
+    for buckets in (None, args.buckets):
+        rate, table = bench_speed(args.iterations, args.searches, buckets, args.seed)
+        if table is None:
+            print(f"{'off':<8}{rate:>14,.0f}")
+        else:
+            print(f"{'on':<8}{rate:>14,.0f}{table.hit_rate:>10.1%}{len(table):>10,}"
+                  f"{table.replacements:>11,}{table.memory_bytes / 1024:>8,.0f}KB")
+
+    # strength: a fresh table per game, shared by all of that side's moves
+    wins = draws = losses = 0
+    for n in range(args.games):
+        np.random.seed(args.seed + n)
+        table = TranspositionTable(args.buckets)
+
+        def with_table(game, player):
+            return monte_carlo_search(game, player, iterations=args.iterations, table=table).move
+
+        def without_table(game, player):
+            return monte_carlo_search(game, player, iterations=args.iterations).move
+
+        table_player = PLAYER_1 if n % 2 == 0 else PLAYER_2
+        winner = play_game({table_player: with_table, other(table_player): without_table},
+                           first_player=PLAYER_1)
+        if winner is None:
+            draws += 1
+        elif winner == table_player:
+            wins += 1
+        else:
+            losses += 1
+
+    score = (wins + 0.5 * draws) / args.games
+    margin = 1.96 * math.sqrt(score * (1 - score) / args.games)
+    print(f"table on vs off, {args.iterations} iterations/move, {args.games} games: "
+          f"wins {wins}  draws {draws}  losses {losses}  score {score:.1%} +/- {margin:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Builds the opening book consulted by GameSessionLayer before searching
+
+    Every position the AI can face in the first --plies plies is searched
+    deeply once: the AI side plays the book move found, the other side
+    branches over every legal reply. Run from the project root:
+    python Selected/build_opening_book.py --plies 8 --iterations 20000"""
+import argparse
+import time
+
+import numpy as np
+
+from game_layer import GameLayer, BOARD_WIDTH, BOARD_HEIGHT, WIN_LENGTH
+from game_session_layer import monte_carlo_search, SearchPool, other, PLAYER_1, PLAYER_2
+from opening_book import write_book, DEFAULT_BOOK_PATH
+
+
+def build_entries(ai_player: int, plies: int, search, entries: dict[int, int], empty: GameLayer):
+    """Adds a book move for every position ai_player can reach from empty before ply plies"""
+    frontier = [empty]
+    player = PLAYER_1
+
+    for ply in range(plies):
+        next_frontier = []
+        for game in frontier:
+            if game.is_over:
+                continue
+
+            if player == ai_player:
+                if game.key not in entries:
+                    entries[game.key] = search(game, player)
+                moves = [entries[game.key]]
+            else:
+                moves = game.open_moves
+
+            for x in moves:
+                next_game = game.copy()
+                next_game.move(player, x)
+                next_frontier.append(next_game)
+
+        # transpositions only need to be expanded once
+        frontier = list({game.key: game for game in next_frontier}.values())
+        player = other(player)
+        print(f"player {ai_player}: ply {ply + 1}, {len(entries)} entries")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--plies", type=int, default=8)
+    parser.add_argument("--iterations", type=int, default=20000, help="search iterations per book move")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=7319)
+    parser.add_argument("--output", default=DEFAULT_BOOK_PATH)
+    parser.add_argument("--width", type=int, default=BOARD_WIDTH)
+    parser.add_argument("--height", type=int, default=BOARD_HEIGHT)
+    parser.add_argument("--win-length", type=int, default=WIN_LENGTH)
+    args = parser.parse_args()
+
+    np.random.seed(args.seed)
+    pool = SearchPool(args.workers) if args.workers > 1 else None
+    iterations = max(1, args.iterations // args.workers)  # per worker
+
+    def search(game, player):
+        return monte_carlo_search(game, player, iterations=iterations, pool=pool).move
+
+    entries = {}
+    start = time.perf_counter()
+    try:
+        for ai_player in (PLAYER_2, PLAYER_1):
+            build_entries(ai_player, args.plies, search, entries,
+                          GameLayer(args.width, args.height, args.win_length))
+    finally:
+        if pool is not None:
+            pool.close()
+
+    write_book(args.output, entries, args.width, args.height, args.win_length)
+    print(f"wrote {len(entries)} entries to {args.output} in {time.perf_counter() - start:.0f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Replays and validates batches of recorded games with numpy
+
+    All games of a batch are advanced together, one ply at a time, on a
+    (games, height, width) cell array; each ply only checks the lines
+    through the cells just played. Results match playing every game
+    through GameLayer.move, which raises on the moves flagged illegal here.
+    Run from the project root to check a game record file:
+    python Selected/bulk_replay.py games.bin"""
+import argparse
+import itertools
+import time
+
+import numpy as np
+
+from game_layer import BOARD_WIDTH, BOARD_HEIGHT, WIN_LENGTH
+from game_record import GameRecordReader, RESULT_DRAW
+
+PAD = -1  # marks the end of a game's moves in a padded batch
+DEFAULT_BATCH_SIZE = 100000
+
+# (row, column) steps along a line, rows counted from the top
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))  # horizontal, vertical, diagonal (\), diagonal (/)
+
+
+class ReplayResult:
+    """Data transfer object that describes a replayed batch of games
+
+        Games stop at their last move, at the move that won them, or before
+        their first illegal move (a column that is out of range or full, or
+        any move after the game was won); later moves are ignored."""
+    def __init__(self,
+                 winner: np.ndarray,
+                 win_ply: np.ndarray,
+                 illegal_ply: np.ndarray,
+                 move_count: np.ndarray,
+                 boards: np.ndarray):
+        self.winner = winner  # 0 while nobody has won, else the winning player
+        self.win_ply = win_ply  # index of the winning move, -1 if none
+        self.illegal_ply = illegal_ply  # index of the first illegal move, -1 if none
+        self.move_count = move_count  # legal moves played
+        self.boards = boards  # (games, height, width) final boards, top row first like GameLayer.grid
+
+    @property
+    def is_draw(self) -> np.ndarray:
+        """Returns which games filled the board without a winner"""
+        return (self.winner == 0) & (self.move_count == self.boards.shape[1] * self.boards.shape[2])
+
+
+def pad_games(games: list[list[int]]) -> np.ndarray:
+    """Returns move lists as a (games, longest game) array padded with PAD"""
+    longest = max((len(moves) for moves in games), default=0)
+    padded = np.full((len(games), longest), PAD, dtype=np.int16)
+    for i, moves in enumerate(games):
+        padded[i, :len(moves)] = moves
+    return padded
+
+
+def replay(moves: np.ndarray,
+           width: int = BOARD_WIDTH,
+           height: int = BOARD_HEIGHT,
+           win_length: int = WIN_LENGTH) -> ReplayResult:
+    """Replays a (games, plies) array of columns, player 1 first
+        Each game ends at its first PAD, or at the end of its row"""
+    moves = np.asarray(moves)
+    games, plies = moves.shape
+    is_pad = moves == PAD
+    lengths = np.where(is_pad.any(axis=1), is_pad.argmax(axis=1), plies)
+
+    boards = np.zeros((games, height, width), dtype=np.int8)
+    heights = np.zeros((games, width), dtype=np.int16)
+    winner = np.zeros(games, dtype=np.int8)
+    win_ply = np.full(games, -1, dtype=np.int16)
+    illegal_ply = np.full(games, -1, dtype=np.int16)
+    move_count = np.zeros(games, dtype=np.int16)
+
+    for ply in range(plies):
+        player = 1 if ply % 2 == 0 else 2
+        index = np.flatnonzero((ply < lengths) & (illegal_ply < 0))
+        if len(index) == 0:
+            break
+
+        x = moves[index, ply].astype(np.intp)
+        in_range = (x >= 0) & (x < width)
+        x = np.where(in_range, x, 0)
+        h = heights[index, x]
+        legal = in_range & (h < height) & (winner[index] == 0)
+
+        illegal_ply[index[~legal]] = ply
+        index, x, h = index[legal], x[legal], h[legal]
+
+        y = height - 1 - h
+        boards[index, y, x] = player
+        heights[index, x] += 1
+        move_count[index] += 1
+
+        won = _has_line_through(boards, index, y, x, player, win_length)
+        winners = index[won]
+        winner[winners] = player
+        win_ply[winners] = ply
+
+    return ReplayResult(winner, win_ply, illegal_ply, move_count, boards)
+
+
+def _has_line_through(boards: np.ndarray,
+                      index: np.ndarray,
+                      y: np.ndarray,
+                      x: np.ndarray,
+                      player: int,
+                      win_length: int) -> np.ndarray:
+    """Returns which boards[index] have win_length of player's pieces in a line through (y, x)"""
+    _, height, width = boards.shape
+    won = np.zeros(len(index), dtype=bool)
+    for dy, dx in DIRECTIONS:
+        count = np.ones(len(index), dtype=np.int16)
+        for sign in (1, -1):
+            run = np.ones(len(index), dtype=bool)  # still counting in this direction
+            for k in range(1, win_length):
+                r, c = y + sign * k * dy, x + sign * k * dx
+                inside = (r >= 0) & (r < height) & (c >= 0) & (c < width)
+                run &= inside & (boards[index, np.clip(r, 0, height - 1), np.clip(c, 0, width - 1)] == player)
+                count += run
+        won |= count >= win_length
+    return won
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="game record file")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    reader = GameRecordReader(args.path)
+    games = illegal = mismatched = 0
+    start = time.perf_counter()
+    records = iter(reader)
+    while batch := list(itertools.islice(records, args.batch_size)):
+        result = replay(pad_games([moves for moves, _ in batch]), reader.width, reader.height, reader.win_length)
+        replayed = np.where(result.is_draw, RESULT_DRAW, result.winner)
+        recorded = np.array([stored for _, stored in batch])
+
+        games += len(batch)
+        illegal += int((result.illegal_ply >= 0).sum())
+        mismatched += int((replayed != recorded).sum())
+    elapsed = time.perf_counter() - start
+    reader.close()
+
+    print(f"{games:,} games in {elapsed:.1f}s ({games / elapsed:,.0f} games/s): "
+          f"{illegal:,} with illegal moves, {mismatched:,} with a result that differs from the record")
+
+
+if __name__ == "__main__":
+    main()
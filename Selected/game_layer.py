@@ -1,68 +1,233 @@
+import random
 import numpy as np
 
 
 UNOCCUPIED = 0
 
+BOARD_WIDTH = 7
+BOARD_HEIGHT = 6
+WIN_LENGTH = 4  # pieces in a line needed to win
+
+ZOBRIST_SEED = 7319  # fixed so position keys are stable between runs
+_zobrist_tables = {}
+
+
+def zobrist_table(width: int, height: int) -> tuple[int, list[list[int]]]:
+    """Returns the Zobrist key of the empty board and the per-player, per-bit
+        random keys for boards of the given size"""
+    if (width, height) not in _zobrist_tables:
+        rng = random.Random(ZOBRIST_SEED)
+        bits = width * (height + 1)
+        empty_key = rng.getrandbits(64)
+        player_keys = [[0] * bits] + [[rng.getrandbits(64) for _ in range(bits)] for _ in (1, 2)]
+        _zobrist_tables[width, height] = (empty_key, player_keys)
+    return _zobrist_tables[width, height]
+
+
+def run_shifts(shift: int, length: int) -> tuple[int, ...]:
+    """Returns the shifts that reduce a mask to the bits starting a run of
+        length set bits spaced shift bits apart: mask &= mask >> s for each.
+        Each step doubles the run length, so four in a row takes two shifts"""
+    shifts = []
+    run = 1
+    while run < length:
+        step = min(run, length - run)
+        shifts.append(step * shift)
+        run += step
+    return tuple(shifts)
+
 
 class Board:
-    """The internal board state used exclusively by Game Layer"""
-    def __init__(self, grid):
-        self._grid = grid
-        self._width = len(self._grid[0])
-        self._height = len(self._grid)
+    """The internal board state used exclusively by Game Layer
+
+        Stored as bitboards: one integer mask per player plus the height of
+        each column. Column x occupies bits x * (height + 1) through
+        x * (height + 1) + height, lowest row first. The extra bit on top of
+        each column is always empty so shifted masks never wrap into the
+        next column. A Zobrist key of the position is kept up to date as
+        pieces are added and removed."""
+    def __init__(self, width: int = BOARD_WIDTH, height: int = BOARD_HEIGHT, win_length: int = WIN_LENGTH):
+        self._width = width
+        self._height = height
+        self._win_length = win_length
+        self._stride = height + 1
+        # vertical, horizontal, diagonal (/), diagonal (\)
+        self._line_shifts = [run_shifts(shift, win_length)
+                             for shift in (1, self._stride, self._stride + 1, self._stride - 1)]
+        self._masks = [0, 0, 0]  # indexed by player #, 0 = all occupied cells
+        self._heights = [0] * width
+        self._key, self._zobrist = zobrist_table(width, height)
 
     @property
     def grid(self):
-        return self._grid
+        """Returns the board as a (height, width) array, top row first"""
+        grid = np.full((self._height, self._width), UNOCCUPIED, dtype=int)
+        for player in (1, 2):
+            mask = self._masks[player]
+            for x in range(self._width):
+                for h in range(self._heights[x]):
+                    if mask >> (x * self._stride + h) & 1:
+                        grid[self._height - 1 - h, x] = player
+        return grid
 
     @property
     def height(self):
         return self._height
 
+    @property
+    def key(self) -> int:
+        """Returns the Zobrist key of the position"""
+        return self._key
+
+    def key_after(self, player: int, x: int) -> int:
+        """Returns the Zobrist key of the position after player drops into x"""
+        return self._key ^ self._zobrist[player][x * self._stride + self._heights[x]]
+
+    @property
+    def masks(self) -> tuple[int, int]:
+        """Returns the (player 1, player 2) bitboards"""
+        return self._masks[1], self._masks[2]
+
     @property
     def width(self):
         return self._width
 
-    def apply_move(self, player: int, x: int, y: int):
-        self._grid[y, x] = player
+    @property
+    def win_length(self):
+        return self._win_length
+
+    @property
+    def size(self) -> int:
+        return self._width * self._height
+
+    def is_playable(self, x: int) -> bool:
+        """Returns whether column x exists and has an open cell"""
+        return 0 <= x < self._width and self._heights[x] < self._height
+
+    def apply_move(self, player: int, x: int) -> int:
+        """Drops a piece for player into column x
+            Returns the row (0 = top) in which the piece landed"""
+        h = self._heights[x]
+        index = x * self._stride + h
+        bit = 1 << index
+        self._masks[player] |= bit
+        self._masks[0] |= bit
+        self._heights[x] = h + 1
+        self._key ^= self._zobrist[player][index]
+        return self._height - 1 - h
+
+    def undo_move(self, x: int):
+        """Removes the top piece from column x"""
+        h = self._heights[x] - 1
+        index = x * self._stride + h
+        bit = 1 << index
+        player = 1 if self._masks[1] & bit else 2
+        self._masks[player] ^= bit
+        self._masks[0] ^= bit
+        self._heights[x] = h
+        self._key ^= self._zobrist[player][index]
+
+    def has_line(self, player: int) -> bool:
+        """Returns whether player occupies win_length adjacent cells in any line"""
+        mask = self._masks[player]
+        for shifts in self._line_shifts:
+            run = mask
+            for shift in shifts:
+                run &= run >> shift
+            if run:
+                return True
+        return False
 
     def copy(self):
-        return Board(np.copy(self._grid))
+        board = Board.__new__(Board)
+        board._width = self._width
+        board._height = self._height
+        board._win_length = self._win_length
+        board._stride = self._stride
+        board._line_shifts = self._line_shifts
+        board._masks = self._masks[:]
+        board._heights = self._heights[:]
+        board._key = self._key
+        board._zobrist = self._zobrist
+        return board
 
 
 class GameLayer:
     """Maintains board state and validates moves against game rules"""
 
-    def __init__(self):
-        self._board = self._create_board()
-        self._winner = None
+    def __init__(self, width: int = BOARD_WIDTH, height: int = BOARD_HEIGHT, win_length: int = WIN_LENGTH):
+        self._width = width
+        self._height = height
+        self._win_length = win_length
+        self.reset()
 
     def reset(self):
         """Reset game state"""
         self._board = self._create_board()
         self._winner = None
+        self._move_count = 0
+        self._history = []  # columns played, most recent last
+        # replaced (never mutated) when a column fills, so lists handed out
+        # by open_moves stay valid
+        self._open_moves = list(range(self._board.width))
+
+    @property
+    def width(self) -> int:
+        return self._width
+
+    @property
+    def height(self) -> int:
+        return self._height
+
+    @property
+    def win_length(self) -> int:
+        return self._win_length
 
     @property
     def winner(self) -> int | None:
         """Returns winning player # if exists"""
         return self._winner
 
+    @property
+    def move_count(self) -> int:
+        """Returns the number of pieces played so far"""
+        return self._move_count
+
     @property
     def is_draw(self) -> bool:
         """Returns whether the game ended in a draw"""
-        all_occupied = np.count_nonzero(self._board.grid == UNOCCUPIED) == 0
-        return self._winner is None and all_occupied
+        return self._winner is None and self._move_count == self._board.size
 
     @property
     def is_over(self) -> bool:
         """Returns whether the game is over (draw or winner)"""
         return self._winner is not None or self.is_draw
 
+    @property
+    def key(self) -> int:
+        """Returns the Zobrist key of the position (for use by AI agent)"""
+        return self._board.key
+
+    def key_after(self, player: int, x: int) -> int:
+        """Returns the Zobrist key after player plays x, without playing it"""
+        return self._board.key_after(player, x)
+
+    @property
+    def bitboards(self) -> tuple[int, int]:
+        """Returns the (player 1, player 2) bitboards (for use by AI agent)
+            See Board for the bit layout"""
+        return self._board.masks
+
+    @property
+    def grid(self):
+        """Returns the board as a (height, width) array, top row first"""
+        return self._board.grid
+
     @property
     def open_moves(self) -> list[int]:
-        """Returns list of playable columns (for use by AI agent)"""
-        return [x for x in range(self._board.width)
-                if np.count_nonzero(self._board.grid[:, x] == UNOCCUPIED) > 0]
+        """Returns list of playable columns (for use by AI agent)
+            The list is shared with the game layer and must not be modified"""
+        return self._open_moves
 
     def move(self, player: int, x: int) -> int:
         """Validates the move, updates state, and checks for winner
@@ -71,69 +236,65 @@ class GameLayer:
         if self.is_over:
             raise Exception("Game is over")
 
-        # determine if col is full
-        if np.count_nonzero(self._board.grid[:, x] == UNOCCUPIED) == 0:
+        # determine if col exists and is not full
+        if not self._board.is_playable(x):
             raise Exception("Illegal move")
 
+        return self.push(player, x)
+
+    def push(self, player: int, x: int) -> int:
+        """Applies a move in place without validating it (for use by AI agent)
+            The move can be taken back with pop(). Returns the row in which
+            the move was applied"""
+
         # apply move in first available row within column
-        y = np.where(self._board.grid[:, x] == UNOCCUPIED)[0][-1]
-        self._board.apply_move(player, x, y)
-
-        rows = [
-            # horizontal (+/- 4 from played cell)
-            [self._board.grid[y, x]
-             for x in range(max(0, x - 4), min(x + 4, self._board.width))],
-
-            # vertical (+/- 4 from played cell)
-            [self._board.grid[y, x]
-             for y in range(max(0, y - 4), min(y + 4, self._board.height))],
-
-            # left -> right (up) diag (+/- 4 from played cell)
-            [self._board.grid[y + n, x + n]
-             for n in range(-4, 5)
-             if
-             0 <= x + n < self._board.width and 0 <= y + n < self._board.height],
-
-            # left -> right (down) diag (+/- 4 from played cell)
-            [self._board.grid[y - n, x + n]
-             for n in range(-4, 5)
-             if
-             0 <= x + n < self._board.width and 0 <= y - n < self._board.height]
-        ]
-
-        # check adjacent rows for a winner
-        for row in rows:
-            if self._winner is not None:
-                break
-
-            if len(row) < 4 or row[len(row) // 2] != player:
-                continue  # player must occupy middle to win horizontally
-
-            num_adjacent = 0
-            for n in row:
-                if n == player:
-                    num_adjacent += 1
-                else:
-                    num_adjacent = 0
-
-                if num_adjacent >= 4:
-                    self._winner = player
-                    break
+        y = self._board.apply_move(player, x)
+        self._move_count += 1
+        self._history.append(x)
+        if y == 0:  # column is now full
+            self._open_moves = [c for c in self._open_moves if c != x]
+
+        # only the piece just dropped can complete a line
+        if self._board.has_line(player):
+            self._winner = player
 
         return y
 
+    def pop(self) -> int:
+        """Takes back the most recent move, returns its column"""
+        x = self._history.pop()
+        if not self._board.is_playable(x):  # column is no longer full
+            self._open_moves = sorted(self._open_moves + [x])
+        self._board.undo_move(x)
+        self._move_count -= 1
+
+        # no moves are accepted after a win, so only the last move can own it
+        self._winner = None
+
+        return x
+
+    def copy(self):
+        """Returns an independent copy of the game state"""
+        game_copy = GameLayer.__new__(GameLayer)
+        game_copy._width = self._width
+        game_copy._height = self._height
+        game_copy._win_length = self._win_length
+        game_copy._board = self._board.copy()
+        game_copy._winner = self._winner
+        game_copy._move_count = self._move_count
+        game_copy._history = self._history[:]
+        game_copy._open_moves = self._open_moves
+        return game_copy
+
     def simulate_move(self, player: int, x: int):
         """Simulates a move. Does not modify existing board state"""
-        game_copy = GameLayer()
-        game_copy._winner = self._winner
-        game_copy._board = self._board.copy()
+        game_copy = self.copy()
 
         if not game_copy.is_over:  # applies move if board has open moves
             game_copy.move(player, x)
 
         return game_copy
 
-    @staticmethod
-    def _create_board() -> Board:
+    def _create_board(self) -> Board:
         """Returns empty board"""
-        return Board(np.full((6, 7), UNOCCUPIED, dtype=int))
+        return Board(self._width, self._height, self._win_length)
@@ -0,0 +1,228 @@
+import mmap
+import os
+import struct
+from array import array
+
+from game_layer import GameLayer, BOARD_WIDTH, BOARD_HEIGHT, WIN_LENGTH
+
+
+# File layout (little-endian):
+#   header  magic, version, board width, board height, win length
+#   games   one record per game, appended in the order written:
+#             move count   uint8, or uint16 on boards of more than 255 cells
+#             result       uint8, one of the RESULT_ constants
+#             moves        columns packed 3 bits each (boards up to 8 wide) or
+#                          4 bits each, first move in the lowest bits, padded
+#                          to a whole byte
+# The index file (path + INDEX_SUFFIX) holds a uint64 offset per game.
+MAGIC = b"C4GR"
+VERSION = 1
+HEADER = struct.Struct("<4sHBBB")
+OFFSET = struct.Struct("<Q")
+INDEX_SUFFIX = ".idx"
+
+RESULT_UNFINISHED = 0
+RESULT_PLAYER_1 = 1
+RESULT_PLAYER_2 = 2
+RESULT_DRAW = 3
+
+
+def game_result(game_layer: GameLayer) -> int:
+    """Returns the RESULT_ constant for the state of game_layer"""
+    if game_layer.winner is not None:
+        return game_layer.winner  # RESULT_PLAYER_1 / RESULT_PLAYER_2
+    if game_layer.is_draw:
+        return RESULT_DRAW
+    return RESULT_UNFINISHED
+
+
+class _RecordFormat:
+    """Record encoding for one board size"""
+    def __init__(self, width: int, height: int):
+        if width > 16:
+            raise Exception("Board is too wide for game records")
+        self.bits = 3 if width <= 8 else 4
+        self.prefix = struct.Struct("<BB" if width * height <= 255 else "<HB")  # move count, result
+        self.mask = (1 << self.bits) - 1
+
+    def encode(self, moves: list[int], result: int) -> bytes:
+        packed = 0
+        for x in reversed(moves):
+            packed = packed << self.bits | x
+        return self.prefix.pack(len(moves), result) + packed.to_bytes((len(moves) * self.bits + 7) // 8, "little")
+
+    def decode(self, data, offset: int) -> tuple[list[int], int, int]:
+        """Returns the moves and result of the record at offset, and the offset of the next record"""
+        count, result = self.prefix.unpack_from(data, offset)
+        start = offset + self.prefix.size
+        end = start + (count * self.bits + 7) // 8
+        packed = int.from_bytes(data[start:end], "little")
+        bits, mask = self.bits, self.mask
+        return [packed >> (bits * i) & mask for i in range(count)], result, end
+
+    def skip(self, data, offset: int) -> int:
+        """Returns the offset of the record after the one at offset"""
+        count = self.prefix.unpack_from(data, offset)[0]
+        return offset + self.prefix.size + (count * self.bits + 7) // 8
+
+
+class GameRecordWriter:
+    """Appends games to a game record file, creating it if needed
+
+        Games are written through buffered files; call close (or use the
+        writer in a with statement) to flush them. Appending to an existing
+        file requires the same board."""
+    def __init__(self,
+                 path: str,
+                 width: int = BOARD_WIDTH,
+                 height: int = BOARD_HEIGHT,
+                 win_length: int = WIN_LENGTH):
+        self._format = _RecordFormat(width, height)
+        self._width = width
+
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        if not is_new:
+            with open(path, "rb") as file:
+                if _read_header(file.read(HEADER.size)) != (width, height, win_length):
+                    raise Exception("Game record file holds games of a different board")
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    if not _index_is_current(path + INDEX_SUFFIX, data, self._format):
+                        with open(path + INDEX_SUFFIX, "wb") as index:
+                            _scan_offsets(data, self._format).tofile(index)
+
+        self._file = open(path, "ab")
+        if is_new:
+            self._file.write(HEADER.pack(MAGIC, VERSION, width, height, win_length))
+        # an index left over from a deleted data file would describe other games
+        self._index = open(path + INDEX_SUFFIX, "wb" if is_new else "ab")
+        self._offset = self._file.tell()
+
+    def write(self, moves: list[int], result: int):
+        """Appends a game given as its columns played, player 1 first, and its RESULT_ constant"""
+        if moves and (min(moves) < 0 or max(moves) >= self._width):
+            raise Exception("Column out of range")
+        record = self._format.encode(moves, result)
+        self._file.write(record)
+        self._index.write(OFFSET.pack(self._offset))
+        self._offset += len(record)
+
+    def close(self):
+        self._file.close()
+        self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class GameRecordReader:
+    """Read-only game record file, memory-mapped
+
+        Iterating reads the games in order without loading the file; the
+        index maps game numbers to offsets for random access. An index that
+        is missing or does not match the file (e.g. after a crash during a
+        write) is rebuilt in memory with one scan. Games are returned as
+        (columns played, RESULT_ constant)."""
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            self.width, self.height, self.win_length = _read_header(file.read(HEADER.size))
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._format = _RecordFormat(self.width, self.height)
+
+        self._index_mmap = None
+        index_path = path + INDEX_SUFFIX
+        if not _index_is_current(index_path, self._mmap, self._format):
+            self._index = _scan_offsets(self._mmap, self._format)
+        elif os.path.getsize(index_path) == 0:
+            self._index = array("Q")
+        else:
+            with open(index_path, "rb") as file:
+                self._index_mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            # native-order view of the offsets, assumes a little-endian host
+            self._index = memoryview(self._index_mmap).cast("Q")
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __getitem__(self, n: int) -> tuple[list[int], int]:
+        """Returns game number n"""
+        moves, result, _ = self._format.decode(self._mmap, self._index[n])
+        return moves, result
+
+    def __iter__(self):
+        data, decode = self._mmap, self._format.decode
+        offset, end = HEADER.size, len(self._mmap)
+        while offset < end:
+            moves, result, offset = decode(data, offset)
+            yield moves, result
+
+    def close(self):
+        if self._index_mmap is not None:
+            self._index.release()
+            self._index_mmap.close()
+        self._mmap.close()
+
+    def replay(self, n: int) -> GameLayer:
+        """Returns game number n played out on a GameLayer"""
+        moves, _ = self[n]
+        game = GameLayer(self.width, self.height, self.win_length)
+        player = 1
+        for x in moves:
+            game.move(player, x)
+            player = 3 - player
+        return game
+
+
+def _read_header(data: bytes) -> tuple[int, int, int]:
+    """Returns (width, height, win length) from a game record file header"""
+    if len(data) < HEADER.size:
+        raise Exception("Not a game record file")
+    magic, version, width, height, win_length = HEADER.unpack(data)
+    if magic != MAGIC or version != VERSION:
+        raise Exception("Not a game record file")
+    return width, height, win_length
+
+
+def _scan_offsets(data, record_format: _RecordFormat) -> array:
+    """Returns the offset of every game in the mapped file data, read in one pass"""
+    offsets = array("Q")
+    offset, end = HEADER.size, len(data)
+    while offset < end:
+        offsets.append(offset)
+        offset = record_format.skip(data, offset)
+    return offsets
+
+
+def _count_games(data, record_format: _RecordFormat) -> int:
+    """Returns the number of games in the mapped file data"""
+    count = 0
+    offset, end = HEADER.size, len(data)
+    while offset < end:
+        offset = record_format.skip(data, offset)
+        count += 1
+    return count
+
+
+def _index_is_current(index_path: str, data, record_format: _RecordFormat) -> bool:
+    """Returns whether the index at index_path holds the offset of every game in the mapped file data
+        The index is written after each game, so it normally lags behind the
+        data; its first game must start after the header, its last game must
+        end the file and it must hold as many offsets as a scan finds"""
+    try:
+        size = os.path.getsize(index_path)
+    except OSError:
+        return False
+    if size % OFFSET.size:
+        return False
+    if size == 0:
+        return len(data) == HEADER.size
+
+    with open(index_path, "rb") as file:
+        first = OFFSET.unpack(file.read(OFFSET.size))[0]
+        file.seek(size - OFFSET.size)
+        last = OFFSET.unpack(file.read(OFFSET.size))[0]
+    if first != HEADER.size or not HEADER.size <= last < len(data) or record_format.skip(data, last) != len(data):
+        return False
+    return _count_games(data, record_format) == size // OFFSET.size
@@ -1,13 +1,29 @@
 import math
+import multiprocessing
+import threading
+import time
 import numpy as np
 from enum import Enum
-from game_layer import GameLayer, Board
+from game_layer import GameLayer, Board, BOARD_WIDTH, BOARD_HEIGHT, WIN_LENGTH
+from search_tree import SearchTree, ROOT
+from transposition_table import TranspositionTable
+from opening_book import open_book, DEFAULT_BOOK_PATH
+from solver import Solver
+from batch_playout import batch_simulate, fits_batch
 
 
 # Player Management Layer constants
 PLAYER_1 = 1
 PLAYER_2 = 2  # represents another player or the AI
 
+# AI constants
+DEFAULT_ITERATIONS = 2000
+CLOCK_CHECK_PLAYOUTS = 16  # playouts between wall-clock checks in timed searches
+POOL_POLL_SECONDS = 0.02  # how often a pool search checks whether it was cancelled
+DEFAULT_SOLVER_THRESHOLD = 16  # empty cells at which the exact solver takes over
+TIMED_SOLVE_MAX_EMPTY = 24  # above this, a solve never fits a move's time budget
+TIMED_SOLVE_BUDGET_SHARE = 0.25  # share of the time budget a timed solve may use
+
 
 class GameMode(Enum):
     SINGLE_PLAYER = 1,
@@ -27,13 +43,123 @@ class MoveResult:
         self.moves = moves
 
 
+class SearchResult:
+    """Data transfer object that describes a completed AI search"""
+    def __init__(self,
+                 move: int,
+                 iterations: int,
+                 elapsed: float,
+                 stats: dict[int, dict],
+                 score: int | None = None):
+        self.move = move
+        self.iterations = iterations  # search iterations achieved (all workers)
+        self.elapsed = elapsed  # wall-clock seconds
+        self.stats = stats  # {"u", "n"} statistics for each root move
+        self.score = score  # exact score (see SolveResult) if the move was solved
+
+
+class SearchPool:
+    """Process pool for root-parallel Monte Carlo search
+        Each worker searches the same position with its own RNG seed and the
+        root statistics are merged. Worker processes are started on first use
+        and kept alive across moves until close(). One search runs at a time;
+        a cancelled search stops its workers through a shared event"""
+    def __init__(self, workers: int):
+        self._workers = workers
+        self._pool = None
+        self._stop = multiprocessing.Event()  # set to stop the workers' current search
+        self._lock = threading.Lock()
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    def search(self,
+               game_layer: GameLayer,
+               player: int,
+               iterations: int | None,
+               playouts: int = 1,
+               time_budget: float | None = None,
+               cancel: threading.Event | None = None) -> tuple[dict[int, dict], int]:
+        """Searches in every worker until its iteration cap or time budget,
+            or until cancel is set
+            Returns merged {"u", "n"} statistics for each root move and the
+            total number of iterations run"""
+        with self._lock:
+            if self._pool is None:
+                self._pool = multiprocessing.Pool(processes=self._workers,
+                                                  initializer=_init_search_worker, initargs=(self._stop,))
+
+            seeds = np.random.randint(2 ** 31, size=self._workers)
+            jobs = [(game_layer, player, iterations, playouts, time_budget, int(seed))
+                    for seed in seeds]
+
+            self._stop.clear()
+            pending = self._pool.map_async(_search_worker, jobs)
+            while not pending.ready():
+                pending.wait(POOL_POLL_SECONDS)
+                if cancel is not None and cancel.is_set():
+                    self._stop.set()
+            results = pending.get()
+
+        merged = {}
+        total_iterations = 0
+        for stats, worker_iterations in results:
+            total_iterations += worker_iterations
+            for move, leaf in stats.items():
+                total = merged.setdefault(move, {"u": 0, "n": 0})
+                total["u"] += leaf["u"]
+                total["n"] += leaf["n"]
+        return merged, total_iterations
+
+    def close(self):
+        """Stops the worker processes"""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+
 class GameSessionLayer:
     """Manages player turn and encapsulates AI implementation"""
 
-    def __init__(self):
-        self._game_layer = GameLayer()
+    def __init__(self,
+                 workers: int = 1,
+                 iterations: int | None = DEFAULT_ITERATIONS,
+                 time_budget: float | None = None,
+                 table_buckets: int | None = None,
+                 book_path: str | None = DEFAULT_BOOK_PATH,
+                 solver_threshold: int | None = DEFAULT_SOLVER_THRESHOLD,
+                 width: int = BOARD_WIDTH,
+                 height: int = BOARD_HEIGHT,
+                 win_length: int = WIN_LENGTH):
+        # board dimensions and pieces in a line needed to win, for every game
+        self._width = width
+        self._height = height
+        self._win_length = win_length
+        self._game_layer = self._create_game_layer()
         self._current_player = None
         self._game_mode = None  # set when game starts
+        self._search_tree = SearchTree()  # kept between AI moves, rooted at the current position
+        # root-parallel search when more than one worker is requested; its
+        # workers search from scratch, without the tree or a table
+        if workers > 1 and table_buckets is not None:
+            raise Exception("A transposition table cannot be used with more than one worker")
+        self._search_pool = SearchPool(workers) if workers > 1 else None
+        # AI search limits, see monte_carlo_search
+        self._iterations = iterations
+        self._time_budget = time_budget
+        self._last_search = None
+        # transposition table shared by every AI search in a game, off by default
+        self._table_buckets = table_buckets
+        self._table = self._create_table()
+        # consulted before searching; the AI searches every move without one
+        self._opening_book = open_book(book_path, width, height, win_length) if book_path is not None else None
+        # exact endgame solver, created on first use
+        self._solver_threshold = solver_threshold
+        self._solver = None
+        # a solve cancelled on an old search thread may still be unwinding
+        self._solver_lock = threading.Lock()
 
     @property
     def game_mode(self) -> GameMode | None:
@@ -45,46 +171,185 @@ class GameSessionLayer:
         """Returns whether the game mode is Multiplayer"""
         return self._game_mode == GameMode.MULTI_PLAYER
 
+    @property
+    def width(self) -> int:
+        return self._width
+
+    @property
+    def height(self) -> int:
+        return self._height
+
+    @property
+    def win_length(self) -> int:
+        return self._win_length
+
     @property
     def current_player(self) -> int:
         """Returns current player (PLAYER_1 or PLAYER_2)"""
         return self._current_player
 
+    @property
+    def last_search(self) -> SearchResult | None:
+        """Returns the result of the most recent AI search, if any"""
+        return self._last_search
+
     def start_session(self, game_mode: GameMode):
         """Starts a new game session"""
         self._game_mode = game_mode
         self.restart_session()
 
     def restart_session(self):
-        """Restarts an existing game session"""
+        """Restarts an existing game session
+            Fresh game and tree objects are created (rather than reset in
+            place) so a cancelled background search can't touch live state"""
         self._current_player = PLAYER_1
-        self._game_layer.reset()
+        self._game_layer = self._create_game_layer()
+        self._search_tree = SearchTree()
+        self._table = self._create_table()
+
+    @property
+    def is_over(self) -> bool:
+        """Returns whether the current game has ended"""
+        return self._game_layer.is_over
+
+    @property
+    def is_ai_turn(self) -> bool:
+        """Returns whether the AI is due to move next"""
+        return (self._game_mode == GameMode.SINGLE_PLAYER
+                and self._current_player == PLAYER_2
+                and not self._game_layer.is_over)
 
     def move(self, x: int) -> MoveResult:
-        """Returns the result of a performed move"""
+        """Returns the result of a performed move
+            In single player mode the AI's reply is searched and applied too"""
+        moves = self.player_move(x).moves
+
+        if self.is_ai_turn:  # get monte carlo move
+            moves += self.apply_ai_move(self.ai_search()).moves
+
+        return self._create_move_result(moves)
+
+    def player_move(self, x: int) -> MoveResult:
+        """Returns the result of the current player's move, without an AI reply"""
 
         if self._game_layer.is_over:
             return self._create_move_result(moves=[])
 
-        moves = []
-
         # make move on behalf of current player
         y = self._game_layer.move(self._current_player, x)
-        moves.append((x, y, self._current_player))
+        self._advance_search_tree(x)
+        moves = [(x, y, self._current_player)]
 
         # switch players
         self._current_player = other(self._current_player)
 
-        if not self._game_layer.is_over and self._game_mode == GameMode.SINGLE_PLAYER:  # get monte carlo move
-            x2 = monte_carlo_move(self._game_layer, self._current_player)
-            y2 = self._game_layer.move(self._current_player, x2)
-            moves.append((x2, y2, self._current_player))
-
-            # switch back to previous player
-            self._current_player = other(self._current_player)
-
         return self._create_move_result(moves)
 
+    def ai_search(self, cancel: threading.Event | None = None) -> SearchResult | None:
+        """Searches for the AI's move without applying it
+            Positions in the opening book are answered without searching.
+            Safe to run off the UI thread while no other moves are made; the
+            game, tree and table are taken once, so a session restarted
+            meanwhile does not mix into this search.
+            Returns None if cancel was set before the search finished"""
+        game_layer = self._game_layer
+        player = self._current_player
+        tree = self._search_tree if self._search_pool is None else None
+        table = self._table
+
+        book_move = self._book_move(game_layer)
+        if book_move is not None:
+            return SearchResult(move=book_move, iterations=0, elapsed=0.0, stats={})
+
+        solved, solve_elapsed = self._solve(game_layer, player, cancel)
+        if cancel is not None and cancel.is_set():
+            return None
+        if solved is not None:
+            return SearchResult(move=solved.move, iterations=0, elapsed=solved.elapsed,
+                                stats={}, score=solved.score)
+
+        time_budget = self._time_budget
+        if time_budget is not None:
+            time_budget = max(0.0, time_budget - solve_elapsed)
+
+        result = monte_carlo_search(game_layer,
+                                    player,
+                                    iterations=self._iterations,
+                                    time_budget=time_budget,
+                                    tree=tree,
+                                    pool=self._search_pool,
+                                    cancel=cancel,
+                                    table=table)
+        if cancel is not None and cancel.is_set():
+            return None
+
+        return result
+
+    def apply_ai_move(self, search_result: SearchResult) -> MoveResult:
+        """Returns the result of applying a move found by ai_search"""
+        self._last_search = search_result
+        return self.player_move(search_result.move)
+
+    def close(self):
+        """Releases AI resources (search worker processes)"""
+        if self._search_pool is not None:
+            self._search_pool.close()
+        if self._opening_book is not None:
+            self._opening_book.close()
+            self._opening_book = None
+
+    def _solve(self, game_layer: GameLayer, player: int, cancel: threading.Event | None):
+        """Solves game_layer with player to move exactly if it is small enough
+            Below the solver threshold the solve is unlimited; otherwise, with
+            a time budget, a solve is tried within a share of the budget.
+            Returns the SolveResult, or None to fall back to the search, and
+            the seconds the solve took"""
+        empty = self._width * self._height - game_layer.move_count
+
+        if self._solver_threshold is not None and empty <= self._solver_threshold:
+            time_budget = None
+        elif self._time_budget is not None and empty <= TIMED_SOLVE_MAX_EMPTY:
+            time_budget = self._time_budget * TIMED_SOLVE_BUDGET_SHARE
+        else:
+            return None, 0.0
+
+        start = time.perf_counter()
+        with self._solver_lock:
+            if self._solver is None:
+                self._solver = Solver(self._width, self._height, self._win_length)
+            solved = self._solver.solve(game_layer, player, time_budget, cancel)
+        return solved, time.perf_counter() - start
+
+    def _book_move(self, game_layer: GameLayer) -> int | None:
+        """Returns the opening book move for game_layer, if any"""
+        opening_book = self._opening_book
+        if opening_book is None:
+            return None
+
+        x = opening_book.lookup(game_layer.key)
+        if x is None or x not in game_layer.open_moves:
+            return None
+
+        return x
+
+    def _create_game_layer(self) -> GameLayer:
+        """Returns an empty game with the session's board dimensions"""
+        return GameLayer(self._width, self._height, self._win_length)
+
+    def _create_table(self) -> TranspositionTable | None:
+        """Returns an empty transposition table, if enabled"""
+        if self._table_buckets is None:
+            return None
+        return TranspositionTable(self._table_buckets)
+
+    def _advance_search_tree(self, x: int):
+        """Re-roots the AI search tree at the position reached by playing x"""
+        child = self._search_tree.child(ROOT, x)
+        if child is None:
+            self._search_tree.clear()
+        else:
+            self._search_tree.reroot(child)
+
     def _create_move_result(self, moves: list[tuple[int, int, int]]) -> MoveResult:
         """Creates result from a move performed"""
         return MoveResult(winner=self._game_layer.winner,
@@ -98,55 +363,229 @@ def other(player):
     return PLAYER_2 if player == PLAYER_1 else PLAYER_1
 
 
-def monte_carlo_move(game_layer: GameLayer, player: int) -> int:
-    """Uses Monte Carlo AI to get the best possible column"""
-    root = {"u": 0, "n": 0}
-    leafs = {move: {"u": 0, "n": 0} for move in game_layer.open_moves}
-
-    for _ in range(2000):
-        move = None
-        for l_move in leafs:
-            if move is None:
-                move = l_move
-            elif ucb1(leafs[l_move], root["n"]) > ucb1(leafs[move], root["n"]):
-                move = l_move
-
-        playout_utility = simulate(game_layer, player, move)
-
-        # 4. back propagation
-        leafs[move]["u"] += playout_utility
-        leafs[move]["n"] += 1
-        root["n"] += 1
-
-    return choose_best_action(leafs)
-
+def monte_carlo_move(game_layer: GameLayer,
+                     player: int,
+                     iterations: int | None = DEFAULT_ITERATIONS,
+                     tree: SearchTree | None = None,
+                     pool: SearchPool | None = None,
+                     playouts: int = 1,
+                     time_budget: float | None = None,
+                     cancel: threading.Event | None = None,
+                     table: TranspositionTable | None = None) -> int:
+    """Uses Monte Carlo AI to get the best possible column
+        See monte_carlo_search for the arguments"""
+    return monte_carlo_search(game_layer, player, iterations, tree, pool,
+                              playouts, time_budget, cancel, table).move
+
+
+def monte_carlo_search(game_layer: GameLayer,
+                       player: int,
+                       iterations: int | None = DEFAULT_ITERATIONS,
+                       tree: SearchTree | None = None,
+                       pool: SearchPool | None = None,
+                       playouts: int = 1,
+                       time_budget: float | None = None,
+                       cancel: threading.Event | None = None,
+                       table: TranspositionTable | None = None) -> SearchResult:
+    """Runs the Monte Carlo AI and reports the best column with search stats
+        The search stops after iterations iterations or time_budget seconds,
+        whichever comes first (either may be None, not both). A tree rooted
+        at the game_layer position may be passed in to continue an earlier
+        search; it is searched in place. With a pool, every worker runs its
+        own search within the same limits instead, starting from an empty
+        tree. playouts > 1 scores each new leaf with that many batched
+        playouts. Setting cancel stops the search early. A table shares
+        statistics between transpositions (not with a pool)"""
+    if iterations is None and time_budget is None:
+        raise Exception("Search needs an iteration cap or a time budget")
+    if pool is not None and (tree is not None or table is not None):
+        raise Exception("Pool searches cannot reuse a tree or table")
+
+    start = time.perf_counter()
+
+    if pool is not None:
+        stats, done = pool.search(game_layer, player, iterations, playouts, time_budget, cancel)
+    else:
+        if tree is None:
+            tree = SearchTree()
+        scratch = game_layer.copy()  # search makes/unmakes moves on this state
+        done = run_search(tree, scratch, player, iterations, playouts, time_budget, cancel, table)
+        stats = tree.child_stats(ROOT)
+
+    return SearchResult(move=choose_best_action(stats),
+                        iterations=done,
+                        elapsed=time.perf_counter() - start,
+                        stats=stats)
+
+
+def run_search(tree: SearchTree,
+               game_layer: GameLayer,
+               player: int,
+               iterations: int | None,
+               playouts: int = 1,
+               time_budget: float | None = None,
+               cancel: threading.Event | None = None,
+               table: TranspositionTable | None = None) -> int:
+    """Runs search iterations until the iteration cap or time budget is hit
+        The clock and cancel are only checked every CLOCK_CHECK_PLAYOUTS
+        playouts. Returns the number of iterations run (always at least one)"""
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    check_interval = max(1, CLOCK_CHECK_PLAYOUTS // playouts)
+
+    done = 0
+    while iterations is None or done < iterations:
+        search_iteration(tree, game_layer, player, playouts, table)
+        done += 1
+
+        if done % check_interval == 0:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            if cancel is not None and cancel.is_set():
+                break
+
+    return done
+
+
+_worker_stop = None  # the pool's stop event, in each search worker process
+
+
+def _init_search_worker(stop):
+    """Search pool worker initializer, keeps the pool's stop event"""
+    global _worker_stop
+    _worker_stop = stop
+
+
+def _search_worker(job) -> tuple[dict[int, dict], int]:
+    """Search pool entry point, returns the root statistics and iteration count of one search"""
+    game_layer, player, iterations, playouts, time_budget, seed = job
+    np.random.seed(seed)
+
+    tree = SearchTree()
+    done = run_search(tree, game_layer, player, iterations, playouts, time_budget, _worker_stop)
+
+    return tree.child_stats(ROOT), done
+
+
+def search_iteration(tree: SearchTree,
+                     game_layer: GameLayer,
+                     player: int,
+                     playouts: int = 1,
+                     table: TranspositionTable | None = None):
+    """Runs one selection/expansion/simulation/back propagation pass
+        game_layer must hold the root position of tree, with player to move.
+        It is left unchanged. The new leaf is scored with playouts playouts"""
+    node = ROOT
+    the_player = player
+    depth = 0
+    path_keys = None if table is None else [game_layer.key]
 
-def ucb1(leaf, parent_n):
-    if leaf["n"] == 0:
+    while True:
+        if game_layer.is_over:  # terminal node, decided by the move into it
+            utility = 0 if game_layer.is_draw else playouts
+            break
+
+        # 1. selection (2. expanding nodes as they are reached)
+        if not tree.is_expanded(node):
+            tree.expand(node, game_layer.open_moves)
+            if table is not None:
+                share_transpositions(tree, node, game_layer, the_player, table)
+        child = select_child(tree, node)
+
+        if tree.visits[child] == 0:
+            # 3. simulation, scored for the player moving into child
+            node = child
+            if table is not None:
+                path_keys.append(game_layer.key_after(the_player, tree.move[child]))
+            if playouts == 1:
+                utility = simulate(game_layer, the_player, tree.move[child])
+            elif fits_batch(game_layer):
+                utility = int(batch_simulate(game_layer, the_player, tree.move[child], playouts).sum())
+            else:
+                utility = sum(simulate(game_layer, the_player, tree.move[child]) for _ in range(playouts))
+            break
+
+        game_layer.push(the_player, tree.move[child])
+        depth += 1
+        node = child
+        the_player = other(the_player)
+        if table is not None:
+            path_keys.append(game_layer.key)
+
+    # 4. back propagation
+    tree.backpropagate(node, utility, playouts)
+
+    if table is not None:
+        for key in reversed(path_keys):
+            table.update(key, utility, playouts)
+            utility = -utility
+
+    for _ in range(depth):
+        game_layer.pop()
+
+
+def share_transpositions(tree: SearchTree,
+                         node: int,
+                         game_layer: GameLayer,
+                         player: int,
+                         table: TranspositionTable):
+    """Starts the new children of node from the statistics the table holds
+        for their positions, which were reached earlier by other move orders.
+        game_layer holds node's position with player to move"""
+    for child in tree.children(node):
+        entry = table.lookup(game_layer.key_after(player, tree.move[child]))
+        if entry is not None:
+            tree.utility[child], tree.visits[child] = entry
+
+
+def select_child(tree: SearchTree, node: int) -> int:
+    """Returns the child of node with the highest UCB1 score"""
+    # children started from transposition statistics can be visited before their parent
+    parent_n = max(tree.visits[node], 1)
+    utility, visits = tree.utility, tree.visits
+    return max(tree.children(node),
+               key=lambda child: ucb1(utility[child], visits[child], parent_n))
+
+
+def ucb1(utility, n, parent_n):
+    if n == 0:
         return +math.inf
 
     C = math.sqrt(2)
-    avg_utility_per_playout = leaf["u"] / leaf["n"]
-    playout_quotient = math.sqrt(math.log(parent_n) / leaf["n"])
+    avg_utility_per_playout = utility / n
+    playout_quotient = math.sqrt(math.log(parent_n) / n)
 
     return avg_utility_per_playout + C * playout_quotient
 
 
 def simulate(game_layer: GameLayer, player: int, x: int):
+    """Plays x for player, then random moves until the game ends
+        Moves are made in place and taken back before returning, so
+        game_layer is left unchanged"""
     the_player = player
-    p_game = game_layer.simulate_move(the_player, x)
-
-    while True:
-        if p_game.is_over:
-            return 1 if p_game.winner == player else -1
-
-        # alternate random moves until terminal state is reached
-        all_actions = p_game.open_moves
+    depth = 0
+    if not game_layer.is_over:  # applies move if board has open moves
+        game_layer.push(the_player, x)
+        depth += 1
+
+    # alternate random moves until terminal state is reached
+    while not game_layer.is_over:
+        all_actions = game_layer.open_moves
         choice = np.random.randint(len(all_actions))
         next_action = all_actions[choice]
 
         the_player = other(the_player)
-        p_game = p_game.simulate_move(the_player, next_action)
+        game_layer.push(the_player, next_action)
+        depth += 1
+
+    if game_layer.is_draw:
+        utility = 0
+    else:
+        utility = 1 if game_layer.winner == player else -1
+
+    for _ in range(depth):
+        game_layer.pop()
+
+    return utility
 
 
 def choose_best_action(leafs):
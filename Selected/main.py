@@ -1,5 +1,15 @@
+import argparse
+
+from game_layer import BOARD_WIDTH, BOARD_HEIGHT, WIN_LENGTH
 from ui_layer import UILayer
 
 
 if __name__ == "__main__":
-    UILayer().draw()
+    parser = argparse.ArgumentParser(description="Connect 4 - Layered")
+    parser.add_argument("--width", type=int, default=BOARD_WIDTH, help="columns")
+    parser.add_argument("--height", type=int, default=BOARD_HEIGHT, help="rows")
+    parser.add_argument("--win-length", type=int, default=WIN_LENGTH, help="pieces in a line needed to win")
+    parser.add_argument("--workers", type=int, default=1, help="processes the AI searches with")
+    args = parser.parse_args()
+
+    UILayer(args.width, args.height, args.win_length, args.workers).draw()
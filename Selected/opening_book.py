@@ -0,0 +1,86 @@
+import bisect
+import mmap
+import os
+import struct
+
+from game_layer import BOARD_WIDTH, BOARD_HEIGHT, WIN_LENGTH, ZOBRIST_SEED
+
+
+# File layout (little-endian):
+#   header  magic, version, board width, board height, win length, Zobrist seed,
+#           entry count
+#   keys    entry count x uint64 Zobrist keys, sorted ascending
+#   moves   entry count x uint8 columns, in key order
+MAGIC = b"C4BK"
+VERSION = 2
+HEADER = struct.Struct("<4sHBBBII")
+
+DEFAULT_BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening_book.bin")
+
+
+class OpeningBook:
+    """Read-only opening book, memory-mapped from a file written by write_book
+
+        Nothing is parsed up front: lookups binary search the sorted key table
+        directly in the mapped file, so opening a book is O(1) and a lookup is
+        O(log n)."""
+    def __init__(self,
+                 path: str,
+                 width: int = BOARD_WIDTH,
+                 height: int = BOARD_HEIGHT,
+                 win_length: int = WIN_LENGTH):
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, book_width, book_height, book_win_length, seed, count = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise Exception("Not an opening book")
+        if (book_width, book_height, book_win_length, seed) != (width, height, win_length, ZOBRIST_SEED):
+            self._mmap.close()
+            raise Exception("Opening book was built for a different board")
+
+        # native-order view of the key table, assumes a little-endian host
+        self._view = memoryview(self._mmap)
+        self._keys = self._view[HEADER.size:HEADER.size + 8 * count].cast("Q")
+        self._moves = self._view[HEADER.size + 8 * count:HEADER.size + 9 * count]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def lookup(self, key: int) -> int | None:
+        """Returns the book column for the position with Zobrist key, if any"""
+        i = bisect.bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            return self._moves[i]
+        return None
+
+    def close(self):
+        self._keys.release()
+        self._moves.release()
+        self._view.release()
+        self._mmap.close()
+
+
+def write_book(path: str,
+               entries: dict[int, int],
+               width: int = BOARD_WIDTH,
+               height: int = BOARD_HEIGHT,
+               win_length: int = WIN_LENGTH):
+    """Writes {Zobrist key: column} entries as an opening book file"""
+    keys = sorted(entries)
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, width, height, win_length, ZOBRIST_SEED, len(keys)))
+        file.write(struct.pack(f"<{len(keys)}Q", *keys))
+        file.write(bytes(entries[key] for key in keys))
+
+
+def open_book(path: str = DEFAULT_BOOK_PATH,
+              width: int = BOARD_WIDTH,
+              height: int = BOARD_HEIGHT,
+              win_length: int = WIN_LENGTH) -> OpeningBook | None:
+    """Returns the opening book at path for the given board, or None if there isn't a usable one"""
+    try:
+        return OpeningBook(path, width, height, win_length)
+    except Exception:  # missing, unreadable, or built for another board
+        return None
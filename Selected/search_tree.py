@@ -0,0 +1,104 @@
+from array import array
+
+
+ROOT = 0
+UNEXPANDED = -1
+
+
+class SearchTree:
+    """Node store for the Monte Carlo search used by Game Session Layer
+
+        Nodes are ids into parallel arrays rather than objects. The children
+        of a node are allocated together, so a node only records the id of
+        its first child and how many children it has. utility[node] is the
+        total playout utility from the point of view of the player who made
+        the move leading to node."""
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        """Removes every node except an empty root"""
+        self.move = array('b', [-1])  # column played to reach node
+        self.parent = array('i', [-1])
+        self.first_child = array('i', [UNEXPANDED])
+        self.child_count = array('b', [0])
+        self.visits = array('i', [0])
+        self.utility = array('d', [0.0])
+
+    def __len__(self) -> int:
+        return len(self.visits)
+
+    def is_expanded(self, node: int) -> bool:
+        return self.first_child[node] != UNEXPANDED
+
+    def children(self, node: int) -> range:
+        first = self.first_child[node]
+        if first == UNEXPANDED:
+            return range(0)
+        return range(first, first + self.child_count[node])
+
+    def child(self, node: int, move: int) -> int | None:
+        """Returns the child of node reached by move, if it has been added"""
+        for child in self.children(node):
+            if self.move[child] == move:
+                return child
+        return None
+
+    def expand(self, node: int, moves: list[int]):
+        """Adds one unvisited child of node per move"""
+        count = len(moves)
+        self.first_child[node] = len(self.visits)
+        self.child_count[node] = count
+
+        self.move.extend(moves)
+        self.parent.extend([node] * count)
+        self.first_child.extend([UNEXPANDED] * count)
+        self.child_count.extend([0] * count)
+        self.visits.extend([0] * count)
+        self.utility.extend([0.0] * count)
+
+    def backpropagate(self, node: int, utility: float, playouts: int = 1):
+        """Adds the total utility of playouts playouts to node and its ancestors
+            utility is from the point of view of the player who moved into
+            node; the sign flips at every level since players alternate"""
+        while node != -1:
+            self.visits[node] += playouts
+            self.utility[node] += utility
+            utility = -utility
+            node = self.parent[node]
+
+    def child_stats(self, node: int) -> dict[int, dict]:
+        """Returns {"u", "n"} statistics for each child of node, keyed by move"""
+        return {self.move[child]: {"u": self.utility[child], "n": self.visits[child]}
+                for child in self.children(node)}
+
+    def reroot(self, node: int):
+        """Makes node the root, discarding every node outside its subtree
+            The kept nodes are copied breadth first into fresh arrays, which
+            keeps each node's children contiguous and frees the rest"""
+        if node == ROOT:
+            return
+
+        move, first_child, child_count = self.move, self.first_child, self.child_count
+        visits, utility = self.visits, self.utility
+
+        self.clear()
+        self.visits[ROOT] = visits[node]
+        self.utility[ROOT] = utility[node]
+
+        queue = [(node, ROOT)]  # (old id, new id)
+        for old, new in queue:
+            first = first_child[old]
+            if first == UNEXPANDED:
+                continue
+
+            self.first_child[new] = len(self.visits)
+            self.child_count[new] = child_count[old]
+            for old_child in range(first, first + child_count[old]):
+                queue.append((old_child, len(self.visits)))
+                self.move.append(move[old_child])
+                self.parent.append(new)
+                self.first_child.append(UNEXPANDED)
+                self.child_count.append(0)
+                self.visits.append(visits[old_child])
+                self.utility.append(utility[old_child])
@@ -0,0 +1,206 @@
+import threading
+import time
+from array import array
+
+from game_layer import GameLayer, BOARD_WIDTH, BOARD_HEIGHT, WIN_LENGTH, run_shifts
+
+
+NODE_CHECK_INTERVAL = 1024  # nodes between clock/cancel checks
+
+
+class SolveResult:
+    """Data transfer object that describes a solved position
+
+        score is from the point of view of the player to move: 0 for a draw,
+        otherwise positive for a win and negative for a loss, larger the
+        sooner the game ends (a win with the mover's last piece scores 1)."""
+    def __init__(self, move: int, score: int, nodes: int, depth: int, elapsed: float):
+        self.move = move
+        self.score = score
+        self.nodes = nodes  # negamax nodes visited
+        self.depth = depth  # depth limit of the iteration that solved it
+        self.elapsed = elapsed  # wall-clock seconds
+
+
+class _Interrupted(Exception):
+    """Raised inside the search when the time budget runs out or it is cancelled"""
+
+
+class Solver:
+    """Exact negamax alpha-beta solver for positions near the end of the game
+
+        Works directly on bitboards in the Board layout, from the side to
+        move's point of view: position holds the mover's pieces and mask all
+        pieces. Moves are tried center first. Iterative deepening bounds the
+        search depth, treating the horizon as a draw; an iteration that never
+        reaches its horizon is exact, and a proven win ends the solve early.
+
+        The transposition table caches upper bounds on scores, keyed by
+        position + mask (unique per position), in fixed arrays where a new
+        entry always replaces the old one. Only bounds from subtrees that
+        never reached the horizon are stored, so entries stay valid across
+        iterations and solves. Keys of boards with more than 64 bits are
+        kept in a list instead, and scores of boards over 253 cells in 16 bits."""
+    def __init__(self,
+                 width: int = BOARD_WIDTH,
+                 height: int = BOARD_HEIGHT,
+                 win_length: int = WIN_LENGTH,
+                 table_size: int = (1 << 20) + 7):
+        self._size = width * height
+        stride = height + 1
+
+        self._bottom = [1 << (x * stride) for x in range(width)]
+        self._top = [1 << (x * stride + height - 1) for x in range(width)]
+        self._column = [((1 << height) - 1) << (x * stride) for x in range(width)]
+        # vertical, horizontal, diagonal (/), diagonal (\)
+        self._line_shifts = [run_shifts(shift, win_length) for shift in (1, stride, stride + 1, stride - 1)]
+        if all(len(shifts) == 2 for shifts in self._line_shifts):
+            # three or four in a row, the move check is unrolled on this hot path
+            self._is_winning_move = self._is_winning_move_two_shifts
+
+        # center first: 3, 2, 4, 1, 5, 0, 6
+        center = width // 2
+        self._order = sorted(range(width), key=lambda x: (abs(x - center), x))
+
+        if width * stride <= 64:
+            self._table_keys = array('Q', [0]) * table_size
+        else:
+            self._table_keys = [0] * table_size
+        # scores reach (cells + 1) // 2, which needs more than a signed byte past 253 cells
+        self._table_values = array('b' if (self._size + 1) // 2 <= 127 else 'h', [0]) * table_size
+
+        self.nodes = 0
+        self._horizon_hit = False
+        self._deadline = None
+        self._cancel = None
+
+    def solve(self,
+              game_layer: GameLayer,
+              player: int,
+              time_budget: float | None = None,
+              cancel: threading.Event | None = None) -> SolveResult | None:
+        """Solves the game_layer position with player to move
+            Returns None if the position is over, or if the time budget ran
+            out (or cancel was set) before the solve finished"""
+        if game_layer.is_over:
+            return None
+
+        start = time.perf_counter()
+        self.nodes = 0
+        self._deadline = None if time_budget is None else start + time_budget
+        self._cancel = cancel
+
+        p1, p2 = game_layer.bitboards
+        mask = p1 | p2
+        position = p1 if player == 1 else p2
+        moves = game_layer.move_count
+
+        best = None
+        try:
+            for depth in range(1, self._size - moves + 1):
+                best, score, exact = self._search_root(position, mask, moves, depth, best)
+                if exact:
+                    return SolveResult(best, score, self.nodes, depth, time.perf_counter() - start)
+        except _Interrupted:
+            return None
+
+        return None  # unreachable: the last depth limit covers every empty cell
+
+    def _search_root(self, position, mask, moves, depth, first) -> tuple[int, int, bool]:
+        """Searches every move at the root to a depth limit
+            Returns (best move, its score, whether the result is exact)"""
+        order = self._order if first is None else [first] + [x for x in self._order if x != first]
+
+        for x in order:
+            if not mask & self._top[x] and self._is_winning_move(position, mask, x):
+                return x, (self._size + 1 - moves) // 2, True
+
+        best, alpha, exact = None, -self._size, True
+        for x in order:
+            if mask & self._top[x]:
+                continue
+
+            self._horizon_hit = False
+            score = -self._negamax(position ^ mask, mask | (mask + self._bottom[x]),
+                                   moves + 1, -self._size, -alpha, depth - 1)
+            # scores at or below alpha are only upper bounds
+            if score > max(alpha, 0) and not self._horizon_hit:
+                return x, score, True  # proven win, possibly not the quickest
+            exact = exact and not self._horizon_hit
+
+            if best is None or score > alpha:
+                best, alpha = x, score
+
+        return best, alpha, exact
+
+    def _negamax(self, position, mask, moves, alpha, beta, depth) -> int:
+        self.nodes += 1
+        if self.nodes % NODE_CHECK_INTERVAL == 0:
+            if self._deadline is not None and time.perf_counter() >= self._deadline:
+                raise _Interrupted()
+            if self._cancel is not None and self._cancel.is_set():
+                raise _Interrupted()
+
+        if moves == self._size:
+            return 0  # draw
+
+        for x in self._order:
+            if not mask & self._top[x] and self._is_winning_move(position, mask, x):
+                return (self._size + 1 - moves) // 2
+
+        if depth == 0:
+            self._horizon_hit = True
+            return 0  # unknown, scored as a draw
+
+        # upper bound: win with our next piece at the earliest
+        upper = (self._size - 1 - moves) // 2
+        key = position + mask
+        slot = key % len(self._table_keys)
+        if self._table_keys[slot] == key:
+            upper = min(upper, self._table_values[slot])
+
+        if beta > upper:
+            beta = upper
+            if alpha >= beta:
+                return beta
+
+        horizon_before = self._horizon_hit
+        self._horizon_hit = False
+
+        for x in self._order:
+            if mask & self._top[x]:
+                continue
+
+            score = -self._negamax(position ^ mask, mask | (mask + self._bottom[x]),
+                                   moves + 1, -beta, -alpha, depth - 1)
+            if score >= beta:
+                self._horizon_hit = self._horizon_hit or horizon_before
+                return score
+            if score > alpha:
+                alpha = score
+
+        if not self._horizon_hit:
+            self._table_keys[slot] = key
+            self._table_values[slot] = alpha
+        self._horizon_hit = self._horizon_hit or horizon_before
+
+        return alpha
+
+    def _is_winning_move_two_shifts(self, position, mask, x) -> bool:
+        after = position | ((mask + self._bottom[x]) & self._column[x])
+        for first, second in self._line_shifts:
+            run = after & (after >> first)
+            if run & (run >> second):
+                return True
+        return False
+
+    def _is_winning_move(self, position, mask, x) -> bool:
+        """Returns whether the mover completes a line by playing x"""
+        after = position | ((mask + self._bottom[x]) & self._column[x])
+        for shifts in self._line_shifts:
+            run = after
+            for shift in shifts:
+                run &= run >> shift
+            if run:
+                return True
+        return False
@@ -0,0 +1,301 @@
+"""Plays a headless round-robin tournament between AI agents
+
+    Every pair of agents plays --games games, alternating who moves first,
+    spread over a process pool. Reports win/draw/loss, Elo estimates, move
+    latency and playouts/s, and optionally writes the results as JSON to
+    track changes between versions. Agents are given as kind:budget, where
+    a budget ending in "s" is a time budget in seconds:
+
+    - mcts:2000, mcts:0.25s    monte_carlo_search on the position alone
+    - session:2000, session:1s GameSessionLayer: opening book, endgame
+                               solver and a search tree kept between moves
+    - blackboard:100           the Blackboard MonteCarlo.find_best_move with
+                               100 simulations per column
+
+    Run from the project root:
+    python Selected/tournament.py mcts:500 mcts:2000 blackboard:100 --games 20
+    --width, --height and --win-length play on another board size."""
+import argparse
+import itertools
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+from game_layer import GameLayer, BOARD_WIDTH, BOARD_HEIGHT, WIN_LENGTH
+from game_session_layer import GameSessionLayer, GameMode, monte_carlo_search, other, PLAYER_1, PLAYER_2
+
+# the Blackboard implementation is a flat set of modules next to this one
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Unselected"))
+from Blackboard import Blackboard  # noqa: E402
+from MonteCarlo import MonteCarlo  # noqa: E402
+
+
+ELO_ITERATIONS = 2000
+PRIOR_DRAWS = 1  # virtual draws per pair, keeps unbeaten agents' ratings finite
+
+
+class MctsAgent:
+    """monte_carlo_search with a fresh tree for every move"""
+    def __init__(self, iterations: int | None, time_budget: float | None):
+        self._iterations = iterations
+        self._time_budget = time_budget
+
+    def start(self):
+        pass
+
+    def choose(self, game: GameLayer, player: int) -> tuple[int, int]:
+        result = monte_carlo_search(game, player, iterations=self._iterations, time_budget=self._time_budget)
+        return result.move, result.iterations
+
+    def observe(self, x: int):
+        pass
+
+    def close(self):
+        pass
+
+
+class SessionAgent:
+    """The full GameSessionLayer AI, following the game move by move"""
+    def __init__(self, iterations: int | None, time_budget: float | None, size: tuple[int, int, int]):
+        width, height, win_length = size
+        self._session = GameSessionLayer(iterations=iterations, time_budget=time_budget,
+                                         width=width, height=height, win_length=win_length)
+
+    def start(self):
+        self._session.start_session(GameMode.MULTI_PLAYER)
+
+    def choose(self, game: GameLayer, player: int) -> tuple[int, int]:
+        result = self._session.ai_search()
+        return result.move, result.iterations
+
+    def observe(self, x: int):
+        self._session.player_move(x)
+
+    def close(self):
+        self._session.close()
+
+
+class BlackboardAgent:
+    """The Blackboard implementation's MonteCarlo AI"""
+    def __init__(self, simulations: int, size: tuple[int, int, int]):
+        width, height, win_length = size
+        self._blackboard = Blackboard(height, width, win_length)
+        self._monte_carlo = MonteCarlo(self._blackboard, simulations_per_move=simulations)
+        self._simulations = simulations
+
+    def start(self):
+        pass
+
+    def choose(self, game: GameLayer, player: int) -> tuple[int, int]:
+        self._blackboard.board = game.grid.tolist()
+        self._blackboard.current_player = player
+        x = self._monte_carlo.find_best_move()
+        return x, self._simulations * len(game.open_moves)
+
+    def observe(self, x: int):
+        pass
+
+    def close(self):
+        pass
+
+
+def create_agent(spec: str, size: tuple[int, int, int] = (BOARD_WIDTH, BOARD_HEIGHT, WIN_LENGTH)):
+    """Returns the agent described by spec (see the module docstring)
+        size is the board's (width, height, win length)"""
+    kind, _, budget = spec.partition(":")
+    if not budget:
+        raise Exception(f"Agent {spec} has no budget")
+
+    if kind == "blackboard":
+        return BlackboardAgent(int(budget), size)
+
+    if budget.endswith("s"):
+        iterations, time_budget = None, float(budget[:-1])
+    else:
+        iterations, time_budget = int(budget), None
+
+    if kind == "mcts":
+        return MctsAgent(iterations, time_budget)
+    if kind == "session":
+        return SessionAgent(iterations, time_budget, size)
+    raise Exception(f"Unknown agent kind {kind}")
+
+
+def play_game(job: tuple[str, str, int, tuple[int, int, int]]) -> dict:
+    """Plays one game, first agent as player 1; returns the game record
+        job is (player 1 spec, player 2 spec, seed, board size)"""
+    specs = {PLAYER_1: job[0], PLAYER_2: job[1]}
+    random.seed(job[2])
+    np.random.seed(job[2])
+
+    width, height, win_length = job[3]
+    agents = {player: create_agent(spec, job[3]) for player, spec in specs.items()}
+    latency = {player: [] for player in agents}
+    playouts = {player: 0 for player in agents}
+
+    game = GameLayer(width, height, win_length)
+    player = PLAYER_1
+    try:
+        for agent in agents.values():
+            agent.start()
+
+        while not game.is_over:
+            start = time.perf_counter()
+            x, done = agents[player].choose(game, player)
+            latency[player].append(time.perf_counter() - start)
+            playouts[player] += done
+
+            game.move(player, x)
+            for agent in agents.values():
+                agent.observe(x)
+            player = other(player)
+    finally:
+        for agent in agents.values():
+            agent.close()
+
+    return {
+        "player_1": specs[PLAYER_1],
+        "player_2": specs[PLAYER_2],
+        "seed": job[2],
+        "winner": None if game.winner is None else specs[game.winner],
+        "moves": game.move_count,
+        "latency": {specs[p]: latency[p] for p in agents},
+        "playouts": {specs[p]: playouts[p] for p in agents},
+    }
+
+
+def elo_ratings(specs: list[str], games: list[dict]) -> dict[str, float]:
+    """Returns maximum likelihood Elo ratings (draws count half), first agent at 0"""
+    points = {spec: 0.5 * PRIOR_DRAWS * (len(specs) - 1) for spec in specs}
+    played = {pair: PRIOR_DRAWS for pair in itertools.permutations(specs, 2)}
+    for game in games:
+        a, b = game["player_1"], game["player_2"]
+        played[a, b] += 1
+        played[b, a] += 1
+        if game["winner"] is None:
+            points[a] += 0.5
+            points[b] += 0.5
+        else:
+            points[game["winner"]] += 1
+
+    ratings = {spec: 0.0 for spec in specs}
+    for _ in range(ELO_ITERATIONS):
+        for spec in specs:
+            total = sum(played[spec, opponent] for opponent in specs if opponent != spec)
+            if not total:
+                continue
+            expected = sum(played[spec, opponent] / (1 + 10 ** ((ratings[opponent] - ratings[spec]) / 400))
+                           for opponent in specs if opponent != spec)
+            step = 400 / math.log(10) * (points[spec] - expected) / total
+            ratings[spec] += step
+
+    anchor = ratings[specs[0]]
+    return {spec: ratings[spec] - anchor for spec in specs}
+
+
+def summarize(specs: list[str], games: list[dict]) -> dict[str, dict]:
+    """Returns per-agent results: win/draw/loss, Elo, latency and playouts/s"""
+    elo = elo_ratings(specs, games)
+    summary = {}
+    for spec in specs:
+        own = [game for game in games if spec in (game["player_1"], game["player_2"])]
+        wins = sum(game["winner"] == spec for game in own)
+        draws = sum(game["winner"] is None for game in own)
+        latency = [t for game in own for t in game["latency"][spec]]
+        playouts = sum(game["playouts"][spec] for game in own)
+        thinking = sum(latency)
+
+        summary[spec] = {
+            "games": len(own),
+            "wins": wins,
+            "draws": draws,
+            "losses": len(own) - wins - draws,
+            "score": (wins + 0.5 * draws) / len(own) if own else 0.0,
+            "elo": elo[spec],
+            "mean_latency": float(np.mean(latency)) if latency else 0.0,
+            "p95_latency": float(np.percentile(latency, 95)) if latency else 0.0,
+            "playouts_per_second": playouts / thinking if thinking else 0.0,
+        }
+    return summary
+
+
+def git_revision() -> str | None:
+    """Returns the checked out commit, if the project is a git checkout"""
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except Exception:  # no git, or not a checkout
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("agents", nargs="+", help="agent specs, e.g. mcts:2000 session:0.5s blackboard:100")
+    parser.add_argument("--games", type=int, default=20, help="games per pair of agents")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=7319)
+    parser.add_argument("--width", type=int, default=BOARD_WIDTH)
+    parser.add_argument("--height", type=int, default=BOARD_HEIGHT)
+    parser.add_argument("--win-length", type=int, default=WIN_LENGTH, help="tokens in a line needed to win")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    if len(set(args.agents)) != len(args.agents) or len(args.agents) < 2:
+        parser.error("give at least two different agents")
+    size = (args.width, args.height, args.win_length)
+    for spec in args.agents:
+        create_agent(spec, size).close()  # fail on a bad spec before starting any games
+
+    jobs = []
+    for a, b in itertools.combinations(args.agents, 2):
+        for n in range(args.games):
+            pair = (a, b) if n % 2 == 0 else (b, a)
+            jobs.append((pair[0], pair[1], args.seed + len(jobs), size))
+
+    start = time.perf_counter()
+    if args.workers > 1:
+        with Pool(args.workers) as pool:
+            games = list(pool.imap_unordered(play_game, jobs))
+    else:
+        games = [play_game(job) for job in jobs]
+    elapsed = time.perf_counter() - start
+    games.sort(key=lambda game: game["seed"])
+
+    summary = summarize(args.agents, games)
+    print(f"{len(games)} games in {elapsed:.1f}s on {args.workers} workers")
+    print(f"{'agent':<18}{'W':>5}{'D':>5}{'L':>5}{'score':>8}{'Elo':>7}"
+          f"{'mean ms':>10}{'p95 ms':>10}{'playouts/s':>12}")
+    for spec, result in summary.items():
+        print(f"{spec:<18}{result['wins']:>5}{result['draws']:>5}{result['losses']:>5}"
+              f"{result['score']:>8.1%}{result['elo']:>+7.0f}"
+              f"{result['mean_latency'] * 1000:>10.1f}{result['p95_latency'] * 1000:>10.1f}"
+              f"{result['playouts_per_second']:>12,.0f}")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({
+                "revision": git_revision(),
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "python": platform.python_version(),
+                "cpus": os.cpu_count(),
+                "workers": args.workers,
+                "games_per_pair": args.games,
+                "seed": args.seed,
+                "board": {"width": args.width, "height": args.height, "win_length": args.win_length},
+                "elapsed": elapsed,
+                "agents": summary,
+                "games": games,
+            }, file, indent=2)
+        print(f"wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
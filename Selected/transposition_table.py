@@ -0,0 +1,102 @@
+from array import array
+
+
+EMPTY = 0  # key stored in unused slots (a real key of 0 is never stored)
+SLOTS_PER_BUCKET = 2
+
+
+class TranspositionTable:
+    """Bounded table of search statistics shared between transpositions
+
+        Positions are looked up by their Zobrist key. The table is a fixed
+        number of two-slot buckets held in parallel arrays:
+
+        - slot 0 is visit-preferred: it keeps the most searched position that
+          maps to the bucket
+        - slot 1 is always-replace: new positions land here, evicting whatever
+          was there, and are promoted to slot 0 once they have more visits
+
+        utility is from the point of view of the player who moved into the
+        position, as in SearchTree."""
+    def __init__(self, buckets: int = 1 << 15):
+        if buckets & (buckets - 1):
+            raise Exception("Bucket count must be a power of two")
+
+        self._mask = buckets - 1
+        self._keys = array('Q', [EMPTY]) * (buckets * SLOTS_PER_BUCKET)
+        self._visits = array('i', [0]) * (buckets * SLOTS_PER_BUCKET)
+        self._utility = array('d', [0.0]) * (buckets * SLOTS_PER_BUCKET)
+
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.replacements = 0  # stores that evicted another position
+
+    @property
+    def capacity(self) -> int:
+        return len(self._keys)
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.probes if self.probes else 0.0
+
+    @property
+    def memory_bytes(self) -> int:
+        """Returns the size of the table's entry arrays"""
+        return sum(a.itemsize * len(a) for a in (self._keys, self._visits, self._utility))
+
+    def __len__(self) -> int:
+        return self.capacity - self._keys.count(EMPTY)
+
+    def clear(self):
+        self._keys[:] = array('Q', [EMPTY]) * self.capacity
+        self._visits[:] = array('i', [0]) * self.capacity
+        self._utility[:] = array('d', [0.0]) * self.capacity
+
+    def lookup(self, key: int) -> tuple[float, int] | None:
+        """Returns the (utility, visits) stored for key, if any"""
+        self.probes += 1
+        slot = self._find(key)
+        if slot is None:
+            return None
+
+        self.hits += 1
+        return self._utility[slot], self._visits[slot]
+
+    def update(self, key: int, utility: float, playouts: int = 1):
+        """Adds playout results to the entry for key, storing it if needed"""
+        slot = self._find(key)
+        if slot is None:
+            slot = self._store(key)
+
+        self._visits[slot] += playouts
+        self._utility[slot] += utility
+
+        preferred = slot & ~1
+        if slot != preferred and self._visits[slot] > self._visits[preferred]:
+            self._swap(slot, preferred)
+
+    def _find(self, key: int) -> int | None:
+        slot = (key & self._mask) * SLOTS_PER_BUCKET
+        if self._keys[slot] == key:
+            return slot
+        if self._keys[slot + 1] == key:
+            return slot + 1
+        return None
+
+    def _store(self, key: int) -> int:
+        self.stores += 1
+        slot = (key & self._mask) * SLOTS_PER_BUCKET
+        if self._keys[slot] != EMPTY:
+            slot += 1  # keep the preferred entry, replace the other one
+            if self._keys[slot] != EMPTY:
+                self.replacements += 1
+
+        self._keys[slot] = key
+        self._visits[slot] = 0
+        self._utility[slot] = 0.0
+        return slot
+
+    def _swap(self, a: int, b: int):
+        for values in (self._keys, self._visits, self._utility):
+            values[a], values[b] = values[b], values[a]
@@ -1,12 +1,235 @@
+import queue
+import threading
+import time
 import tkinter as tk
+from collections import deque
 import numpy as np
 from game_session_layer import GameSessionLayer, GameMode, PLAYER_1, MoveResult
+from game_layer import BOARD_WIDTH, BOARD_HEIGHT, WIN_LENGTH
 import random
 from tkinter import colorchooser
 FONT = "Helvetica"
+AI_POLL_MS = 20  # how often the Tk loop checks for a finished AI search
+BOARD_AREA = 420  # pixels available for the board in each direction
+MAX_CELL_PITCH = 60  # cell size plus padding on the standard board
+PARTICLE_POOL_SIZE = 96  # most particles on screen at once
+PARTICLE_FPS = 30  # frame-rate cap of the particle animation
+PARTICLE_SPEED = 66  # pixels per second
+PARTICLE_SPAWN_RATE = 10  # new particles per second
+PARTICLE_PAUSED_MS = 250  # how often a paused animation checks whether to resume
+DROP_ROW_MS = 30  # time for a piece to fall one row
+DROP_FRAME_MS = 15  # frame interval of the drop animation
+MAX_QUEUED_DROPS = 3  # unfinished drops beyond which all drops skip to the end
+
+
+class ParticleAnimation:
+    """Falling particles drawn from a fixed pool of canvas items
+
+        The pool is created once per canvas. Every frame moves all falling
+        particles with a single canvas call; particles that leave the canvas
+        are hidden and reused by later spawns. The animation pauses while the
+        canvas is not viewable (e.g. minimized) or is_paused returns True."""
+    def __init__(self, root: tk.Tk, is_paused=lambda: False, fps: int = PARTICLE_FPS,
+                 pool_size: int = PARTICLE_POOL_SIZE):
+        self._root = root
+        self._is_paused = is_paused
+        self._frame_ms = 1000 // fps
+        self._step = PARTICLE_SPEED * self._frame_ms / 1000
+        self._spawn_chance = PARTICLE_SPAWN_RATE * self._frame_ms / 1000
+        self._pool_size = pool_size
+        self._canvas = None
+        self._width = 0
+        self._height = 0
+        self._after_id = None
+        self._frame = 0
+        self._free = []  # hidden items
+        self._falling = deque()  # (item, spawn frame), oldest (lowest) first
+
+    def attach(self, canvas: tk.Canvas, width: int, height: int):
+        """Animate on a width x height canvas, stopping on the previous one"""
+        self.stop()
+        self._canvas = canvas
+        self._width = width
+        self._height = height
+        self._free = [canvas.create_oval(0, 0, 0, 0, outline="", state=tk.HIDDEN, tags="particles")
+                      for _ in range(self._pool_size)]
+        self._falling.clear()
+        self._after_id = self._root.after(self._frame_ms, self._tick)
+
+    def stop(self):
+        if self._after_id is not None:
+            self._root.after_cancel(self._after_id)
+            self._after_id = None
+        self._canvas = None
+
+    def _tick(self):
+        canvas = self._canvas
+        try:
+            if not canvas.winfo_exists():
+                self._after_id = None  # the page was cleared
+                return
+            if self._is_paused() or not canvas.winfo_viewable():
+                self._after_id = self._root.after(PARTICLE_PAUSED_MS, self._tick)
+                return
+            self._draw_frame(canvas)
+        except tk.TclError:
+            self._after_id = None  # the window is closing
+            return
+        self._after_id = self._root.after(self._frame_ms, self._tick)
+
+    def _draw_frame(self, canvas: tk.Canvas):
+        self._frame += 1
+        canvas.move("falling", 0, self._step)
+
+        # all particles fall at the same speed, so the oldest leave first
+        falling = self._falling
+        while falling and (self._frame - falling[0][1]) * self._step >= self._height:
+            item, _ = falling.popleft()
+            canvas.itemconfigure(item, state=tk.HIDDEN, tags="particles")
+            self._free.append(item)
+
+        if self._free and random.random() < self._spawn_chance:
+            item = self._free.pop()
+            x = random.randint(0, self._width)
+            r = random.randint(1, 3)
+            canvas.coords(item, x - r, -r, x + r, r)
+            canvas.itemconfigure(item, fill=random.choice(["#6666ff", "#8888ff", "#9999ff"]),
+                                 state=tk.NORMAL, tags=("particles", "falling"))
+            falling.append((item, self._frame))
+
+
+class PieceDrop:
+    """A piece falling into column x until it lands in row y"""
+    def __init__(self, x: int, y: int, fill: str):
+        self.x = x
+        self.y = y
+        self.fill = fill
+        self.progress = 0.0  # rows fallen
+        self.row = None  # row the piece is drawn in
+
+
+class DropAnimator:
+    """Animates piece drops from after() callbacks, never blocking the Tk loop
+
+        Drops in different columns fall at the same time; a drop into a
+        column that is still animating waits for it to land. While several
+        drops are unfinished they all fall that many times faster, and
+        beyond MAX_QUEUED_DROPS every drop skips straight to its end."""
+    def __init__(self, root: tk.Tk):
+        self._root = root
+        self._canvas = None
+        self._cells = None
+        self._empty_fill = None
+        self._falling = {}  # column -> PieceDrop
+        self._waiting = deque()
+        self._idle_callbacks = []
+        self._after_id = None
+        self._last_frame = 0.0
+
+    def attach(self, canvas: tk.Canvas, cells: np.ndarray, empty_fill: str):
+        """Animate on a board whose cell items are cells[x, y], dropping anything queued"""
+        self.cancel()
+        self._canvas = canvas
+        self._cells = cells
+        self._empty_fill = empty_fill
+
+    @property
+    def is_idle(self) -> bool:
+        return not self._falling and not self._waiting
+
+    def drop(self, x: int, y: int, fill: str):
+        """Queues a piece falling into column x to row y"""
+        self._waiting.append(PieceDrop(x, y, fill))
+        if len(self._falling) + len(self._waiting) > MAX_QUEUED_DROPS:
+            self.skip()
+            return
+
+        self._start_waiting()
+        if self._after_id is None:
+            self._last_frame = time.perf_counter()
+            self._after_id = self._root.after(DROP_FRAME_MS, self._tick)
+
+    def when_idle(self, callback):
+        """Calls callback once every queued drop has landed, right away if none are queued"""
+        if self.is_idle:
+            callback()
+        else:
+            self._idle_callbacks.append(callback)
+
+    def skip(self):
+        """Lands every queued drop at once"""
+        for drop in list(self._falling.values()) + list(self._waiting):
+            self._draw(drop, drop.y)
+        self._falling.clear()
+        self._waiting.clear()
+        self._stop()
+        self._run_idle_callbacks()
+
+    def cancel(self):
+        """Forgets every queued drop and idle callback without drawing, e.g. when the board is cleared"""
+        self._falling.clear()
+        self._waiting.clear()
+        self._idle_callbacks = []
+        self._stop()
+
+    def _stop(self):
+        if self._after_id is not None:
+            self._root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _start_waiting(self):
+        waiting = deque()
+        for drop in self._waiting:
+            if drop.x in self._falling:
+                waiting.append(drop)  # lands on the piece still falling in its column
+            else:
+                self._falling[drop.x] = drop
+                self._draw(drop, 0)
+        self._waiting = waiting
+
+    def _tick(self):
+        self._after_id = None
+        now = time.perf_counter()
+        speed = len(self._falling) + len(self._waiting)
+        rows = (now - self._last_frame) * 1000 / DROP_ROW_MS * speed
+        self._last_frame = now
+
+        try:
+            for x, drop in list(self._falling.items()):
+                drop.progress = min(drop.y, drop.progress + rows)
+                self._draw(drop, int(drop.progress))
+                if drop.row == drop.y:
+                    del self._falling[x]
+            self._start_waiting()
+        except tk.TclError:
+            self.cancel()  # the board was destroyed
+            return
+
+        if self.is_idle:
+            self._run_idle_callbacks()
+        else:
+            self._after_id = self._root.after(DROP_FRAME_MS, self._tick)
+
+    def _draw(self, drop: PieceDrop, row: int):
+        if row == drop.row:
+            return
+        if drop.row is not None:
+            self._canvas.itemconfig(self._cells[drop.x, drop.row], fill=self._empty_fill)
+        self._canvas.itemconfig(self._cells[drop.x, row], fill=drop.fill)
+        drop.row = row
+
+    def _run_idle_callbacks(self):
+        callbacks, self._idle_callbacks = self._idle_callbacks, []
+        for callback in callbacks:
+            callback()
+
 
 class UILayer(tk.Frame):
-    def __init__(self):
+    def __init__(self,
+                 width: int = BOARD_WIDTH,
+                 height: int = BOARD_HEIGHT,
+                 win_length: int = WIN_LENGTH,
+                 workers: int = 1):
         self.root = tk.Tk()
         self.root.title("Connect 4 - Layered")
 
@@ -16,63 +239,38 @@ class UILayer(tk.Frame):
         # game board fields/components
         self.canvas = None
         self.cells = None
-        self.cell_size = 50
-        self.cell_padding = 10
+        # cells shrink to fit larger boards
+        pitch = min(MAX_CELL_PITCH, BOARD_AREA // max(width, height))
+        self.cell_padding = max(2, pitch // 6)
+        self.cell_size = pitch - self.cell_padding
         self.player_turn_label = None
 
-        self.particles = []
         self.canvas_bg = None
 
-        self.animate_particles()
+        # set while an AI search runs in the background; clicks are ignored
+        self._ai_cancel = None
 
-        self._game_session_layer = GameSessionLayer()
+        # paused while the AI searches, so it does not compete for the CPU
+        self.particles = ParticleAnimation(self.root, is_paused=lambda: self._ai_cancel is not None)
+        self.drops = DropAnimator(self.root)
 
-    def animate_particles(self):
-        if not self.canvas or not self.canvas.winfo_exists():
-            self.root.after(50, self.animate_particles)
-            return
+        self._game_session_layer = GameSessionLayer(workers=workers, width=width, height=height, win_length=win_length)
 
-        try:
-            self.canvas.delete("particles")
-        except tk.TclError:
-            return
-
-        if random.random() < 0.3:
-            x = random.randint(0, 400)
-            size = random.randint(1, 3)
-            color = random.choice(["#6666ff", "#8888ff", "#9999ff"])
-            self.particles.append([x, 0, size, color])
-
-        updated_particles = []
-        for x, y, r, color in self.particles:
-            y += 2
-            if y < 400:
-                self.canvas.create_oval(x - r, y - r, x + r, y + r, fill=color, outline='', tags="particles")
-                updated_particles.append([x, y, r, color])
-        self.particles = updated_particles
-
-        self.root.after(30, self.animate_particles)
-
-    def animate_piece_drop(self, x, y, player, delay=30):
+    def animate_piece_drop(self, x, y, player):
+        """Queue the drop animation of player's piece into column x, row y"""
         color1 = self.player1_color if hasattr(self, "player1_color") else "red"
         color2 = self.player2_color if hasattr(self, "player2_color") else "yellow"
-        fill = color1 if player == PLAYER_1 else color2
-
-        for i in range(y + 1):
-            if i > 0:
-                self.canvas.itemconfig(self.cells[x, i - 1], fill=self.board_color)
-            self.canvas.itemconfig(self.cells[x, i], fill=fill)
-            self.canvas.update()
-            self.root.after(delay)
+        self.drops.drop(x, y, color1 if player == PLAYER_1 else color2)
 
     def display_menu_page(self):
 
+        self.cancel_ai_search()
         self.clear_window()
         self.root.geometry("500x500")
 
         self.canvas = tk.Canvas(self.root, width=500, height=500, bg="black", highlightthickness=0)
         self.canvas.pack(fill="both", expand=True)
-        self.animate_particles()
+        self.particles.attach(self.canvas, 500, 500)
 
         title = tk.Label(self.root,
                          text="Connect-4",
@@ -134,7 +332,7 @@ class UILayer(tk.Frame):
         main_container.grid_columnconfigure(1, weight=1, minsize=200)
         main_container.grid_rowconfigure(0, weight=1)
 
-        self.cells = np.zeros((7, 6), dtype=int)
+        self.cells = np.zeros((self._game_session_layer.width, self._game_session_layer.height), dtype=int)
 
         game_frame = tk.Frame(main_container, width=400, height=200)
         game_frame.grid(row=0, column=0, padx=10, pady=10, sticky="nsew")
@@ -182,13 +380,15 @@ class UILayer(tk.Frame):
 
 
         self.display_board_widget()
+        self.drops.attach(self.canvas, self.cells, self.board_color if hasattr(self, "board_color") else "white")
+        self.particles.attach(self.canvas, 400, 400)
 
     def display_color_selector(self):
         self.clear_window()
 
         self.canvas = tk.Canvas(self.root, width=500, height=400, bg="black", highlightthickness=0)
         self.canvas.pack(fill="both", expand=True)
-        self.animate_particles()
+        self.particles.attach(self.canvas, 500, 400)
 
         self.player1_color = "#ff3333"
         self.player2_color = "#3333ff"
@@ -229,7 +429,7 @@ class UILayer(tk.Frame):
     def display_end_page(self, result: MoveResult):
         """Display end page for a given result"""
         self.clear_window()
-        self.cells = np.zeros((7, 6), dtype=int)
+        self.cells = np.zeros((self._game_session_layer.width, self._game_session_layer.height), dtype=int)
 
         label = tk.Label(self.root,
                          text="Game Over",
@@ -297,25 +497,80 @@ class UILayer(tk.Frame):
         self.display_game_page(game_mode=game_mode)
 
     def handle_restart_click(self):
+        self.cancel_ai_search()
         self._game_session_layer.restart_session()
         self.display_game_page(self._game_session_layer.game_mode)
 
     def handle_cell_click(self, event):
         """Handle game cell clicked event"""
 
+        if self._ai_cancel is not None:
+            return  # AI is still thinking
+        if self._game_session_layer.is_over:
+            return  # the last piece is still falling before the end page
+
         # Convert click coordinates to grid position
         x = event.x // (self.cell_size + self.cell_padding)
 
-        if 0 <= x <= len(self.cells[0]):
-            move_result = self._game_session_layer.move(x)
-            for (x, y, player) in move_result.moves:
-                self.animate_piece_drop(x, y, player)
+        if 0 <= x < len(self.cells):
+            self.display_move_result(self._game_session_layer.player_move(x))
+
+            if self._game_session_layer.is_ai_turn:
+                self.start_ai_search()
+
+    def display_move_result(self, move_result: MoveResult):
+        """Render the moves in a result and show the end page if the game is over"""
+        for (x, y, player) in move_result.moves:
+            self.animate_piece_drop(x, y, player)
+
+        if self._game_session_layer.is_multiplayer:
+            self.update_player_turn_label()
+
+        if move_result.is_over:
+            # leave the board up until the last piece has landed
+            self.drops.when_idle(lambda: self.display_end_page(move_result))
+
+    def start_ai_search(self):
+        """Run the AI search on a worker thread and poll for its result"""
+        cancel = threading.Event()
+        results = queue.Queue(maxsize=1)
+        self._ai_cancel = cancel
+
+        session = self._game_session_layer
+
+        def search():
+            # a failed search hands over its exception, so the poll does not wait forever
+            try:
+                results.put(session.ai_search(cancel))
+            except Exception as e:
+                results.put(e)
+
+        threading.Thread(target=search, daemon=True).start()
+        self.root.after(AI_POLL_MS, self.poll_ai_search, cancel, results)
+
+    def poll_ai_search(self, cancel: threading.Event, results: queue.Queue):
+        """Apply the AI move once its search has finished
+            A search that failed unlocks the board and raises its exception
+            in the Tk loop, which reports it"""
+        if cancel.is_set():
+            return  # restarted or left the game while searching
+
+        try:
+            search_result = results.get_nowait()
+        except queue.Empty:
+            self.root.after(AI_POLL_MS, self.poll_ai_search, cancel, results)
+            return
 
-            if self._game_session_layer.is_multiplayer:
-                self.update_player_turn_label()
+        self._ai_cancel = None
+        if isinstance(search_result, Exception):
+            raise search_result
+        self.display_move_result(self._game_session_layer.apply_ai_move(search_result))
 
-            if move_result.is_over:
-                self.display_end_page(move_result)
+    def cancel_ai_search(self):
+        """Stop a running AI search and discard its result"""
+        if self._ai_cancel is not None:
+            self._ai_cancel.set()
+            self._ai_cancel = None
 
     def update_player_turn_label(self):
         """Generate turn label"""
@@ -324,6 +579,7 @@ class UILayer(tk.Frame):
 
     def clear_window(self):
         """Destroy existing widgets in tkinter root"""
+        self.drops.cancel()
         for widget in self.root.winfo_children():
             widget.destroy()
 
@@ -331,3 +587,4 @@ class UILayer(tk.Frame):
         """Present menu and start game loop"""
         self.display_menu_page()
         self.root.mainloop()
+        self._game_session_layer.close()
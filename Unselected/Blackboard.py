@@ -1,7 +1,98 @@
+from collections import namedtuple
+
+# Immutable game state. The board is a tuple of row tuples, so a move builds
+# one new row and shares the other rows with the previous version.
+# 0 represents empty(no tokens), 1 and 2 represent player 1 and 2's tokens.
+BlackboardState = namedtuple("BlackboardState", [
+    "version",  # increases with every write
+    "board",
+    "current_player",
+    "opponent_type",
+    "last_move",  # (row, column) of the last token placed, None before the first move
+    "move_count",
+    # written by the win checker: the number of moves it has checked, and
+    # the winner (0 for a draw) with the winning positions once decided
+    "checked_move_count",
+    "winner",
+    "winning_positions",
+])
+
+
+def _state_field(name):
+    # attribute backed by the current state; assigning it writes a new version
+    return property(lambda self: getattr(self._state, name),
+                    lambda self, value: self.update(**{name: value}))
+
+
 class Blackboard:
-    def __init__(self):
-        # Initialize the board with a 6x7 grid filled with 0s.
-        # 0 represents empty(no tokens), 1 and 2 represent player 1 and 2's tokens.
-        self.board = [[0 for _ in range(7)] for _ in range(6)]
-        self.current_player = 1
-        self.opponent_type = 'Monte Carlo AI'
+    """Shared game state, published as immutable versioned snapshots
+
+    Readers such as the AI search or the renderer take a snapshot() and can
+    hold it without copying or locking; is_stale tells them when it has been
+    superseded. Every write replaces the current state with a new version."""
+    current_player = _state_field("current_player")
+    opponent_type = _state_field("opponent_type")
+    last_move = _state_field("last_move")
+    move_count = _state_field("move_count")
+    checked_move_count = _state_field("checked_move_count")
+    winner = _state_field("winner")
+    winning_positions = _state_field("winning_positions")
+
+    def __init__(self, rows=6, columns=7, win_length=4):
+        # board size and tokens in a line needed to win, fixed for the blackboard's lifetime
+        self.rows = rows
+        self.columns = columns
+        self.win_length = win_length
+        self.empty_board = tuple(tuple(0 for _ in range(columns)) for _ in range(rows))
+        self._state = BlackboardState(version=0, board=self.empty_board, current_player=1,
+                                      opponent_type='Monte Carlo AI', last_move=None, move_count=0,
+                                      checked_move_count=0, winner=None, winning_positions=None)
+
+    @property
+    def version(self):
+        return self._state.version
+
+    @property
+    def board(self):
+        return self._state.board
+
+    @board.setter
+    def board(self, board):
+        # accepts any rows x columns nested sequence, such as a list of lists
+        self.update(board=tuple(tuple(row) for row in board))
+
+    def reset(self):
+        self.update(board=self.empty_board, current_player=1, last_move=None, move_count=0,
+                    checked_move_count=0, winner=None, winning_positions=None)
+
+    def update(self, **changes):
+        """Write a new version with the given fields changed."""
+        self._state = self._state._replace(version=self._state.version + 1, **changes)
+
+    def place_token(self, row, column, player):
+        """Write a new version with player's token at (row, column) as the last move."""
+        state = self._state
+        board = state.board
+        new_row = board[row][:column] + (player,) + board[row][column + 1:]
+        # built directly rather than with update: this is the hot write
+        self._state = BlackboardState(state.version + 1, board[:row] + (new_row,) + board[row + 1:],
+                                      state.current_player, state.opponent_type, (row, column),
+                                      state.move_count + 1, state.checked_move_count,
+                                      state.winner, state.winning_positions)
+
+    def snapshot(self):
+        # the current state is immutable, so it is handed out as is
+        return self._state
+
+    def is_stale(self, snapshot):
+        return snapshot.version != self._state.version
+
+    def changed_cells(self, snapshot):
+        """Return (row, column, token) for every cell that differs between snapshot and the current state."""
+        changes = []
+        for row, (old_row, new_row) in enumerate(zip(snapshot.board, self._state.board)):
+            if old_row is new_row:
+                continue  # rows not written since the snapshot are shared, not copied
+            changes.extend((row, column, token)
+                           for column, (old, token) in enumerate(zip(old_row, new_row)) if old != token)
+        return changes
@@ -1,9 +1,18 @@
+import argparse
 import tkinter as tk
 from StartMenu import StartMenu
 from GameBoard import GameBoard
 from WinnerDisplay import WinnerDisplay
 from Blackboard import Blackboard
 from ColorSelector import ColorSelector
+from Controller import Controller
+from MoveValidator import MoveValidator
+from MoveProcessor import MoveProcessor
+from PlayerManager import PlayerManager
+from WinCheck import WinChecker
+from MonteCarlo import MonteCarlo
+
+EVENT_POLL_MS = 20
 
 class Connect4App:
     def __init__(self, root, blackboard):
@@ -18,6 +27,23 @@ class Connect4App:
         self.game_board = None
         self.winner_display = None  # Initialize to avoid errors
 
+        # knowledge sources register with the controller once, then only react to events
+        self.controller = Controller(blackboard)
+        self.knowledge_sources = [
+            WinChecker(blackboard),
+            MoveProcessor(blackboard, MoveValidator(blackboard)),
+            PlayerManager(blackboard),
+            MonteCarlo(blackboard),
+        ]
+        for source in self.knowledge_sources:
+            source.register(self.controller)
+        self.poll_events()
+
+    def poll_events(self):
+        # results from the worker pool are dispatched on the Tk thread
+        self.controller.process_events()
+        self.root.after(EVENT_POLL_MS, self.poll_events)
+
     def start_game(self, opponent):
         # Hide the winner display if it exists
         if hasattr(self, 'winner_display') and self.winner_display:
@@ -25,9 +51,10 @@ class Connect4App:
         # Hide the game board if it exists
         if self.game_board:
             self.game_board.pack_forget()
+            self.game_board.detach()
         #create a new game board based on the selected opponent
         self.blackboard.opponent_type = opponent 
-        self.game_board = GameBoard(self.root, self.blackboard, self.start_new_game, self.restart_game, self)
+        self.game_board = GameBoard(self.root, self.blackboard, self.controller, self.start_new_game, self.restart_game, self)
         self.game_board.pack()
         # Hide the start menu ui 
         self.start_menu.pack_forget()
@@ -50,16 +77,14 @@ class Connect4App:
         # Hide the winner display if it exists
         if self.winner_display:
             self.winner_display.pack_forget()
-        self.blackboard.board = [[0 for _ in range(7)] for _ in range(6)]
-        self.blackboard.current_player = 1  
+        self.controller.reset()
         if self.game_board:
             self.game_board.pack_forget()
         self.start_menu.pack()
 
     def restart_game(self):
         """Resets the board without returning to the main menu."""
-        self.blackboard.board = [[0 for _ in range(7)] for _ in range(6)]
-        self.blackboard.current_player = 1  
+        self.controller.reset()
         if self.game_board:
             self.game_board.draw_board()
             self.game_board.update_player_turn_label()
@@ -73,15 +98,21 @@ class Connect4App:
 
     def replay_game(self):
         """Replays the last game with the same settings."""
-        self.blackboard.board = [[0 for _ in range(7)] for _ in range(6)]
-        self.blackboard.current_player = 1  
+        self.controller.reset()
         self.start_game(self.blackboard.opponent_type)
         if self.winner_display:
             self.winner_display.pack_forget()
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play Connect 4")
+    parser.add_argument("--rows", type=int, default=6)
+    parser.add_argument("--columns", type=int, default=7)
+    parser.add_argument("--win-length", type=int, default=4, help="tokens in a line needed to win")
+    args = parser.parse_args()
+
     root = tk.Tk()
     root.title("Connect 4")
-    app = Connect4App(root, Blackboard())
+    app = Connect4App(root, Blackboard(args.rows, args.columns, args.win_length))
     root.mainloop()
+    app.controller.shutdown()
@@ -0,0 +1,73 @@
+import queue
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+# events published on the blackboard, with the data passed to subscribers
+MOVE_REQUESTED = "move requested"  # column, player, move_count
+MOVE_APPLIED = "move applied"  # row, column, player
+WIN_CHECKED = "win checked"  # move_count, winner, positions
+TURN_CHANGED = "turn changed"  # player
+GAME_OVER = "game over"  # winner (0 for a draw), positions
+
+
+class Controller:
+    """Blackboard control component that schedules the knowledge sources
+
+    Knowledge sources subscribe once to the events they react to. Events are
+    queued and dispatched by process_events on the Tk thread, so only that
+    thread ever writes the blackboard. Handlers subscribed as concurrent run
+    on the worker pool instead, given the blackboard snapshot current when
+    the event was dispatched, and may return an (event, data) pair to
+    publish their result."""
+    def __init__(self, blackboard, workers=2):
+        self.blackboard = blackboard
+        self.subscribers = {}  # event -> [(handler, concurrent)]
+        self.events = queue.Queue()
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        # bumped on every new game so results of old work are dropped
+        self.generation = 0
+
+    def subscribe(self, event, handler, concurrent=False):
+        self.subscribers.setdefault(event, []).append((handler, concurrent))
+
+    def unsubscribe(self, event, handler):
+        self.subscribers[event] = [(h, c) for h, c in self.subscribers.get(event, []) if h != handler]
+
+    def publish(self, event, **data):
+        # safe to call from any thread
+        self.events.put((self.generation, event, data))
+
+    def process_events(self):
+        """Dispatch every queued event, including events published while dispatching."""
+        while True:
+            try:
+                generation, event, data = self.events.get_nowait()
+            except queue.Empty:
+                return
+
+            if generation != self.generation:
+                continue  # published before the game was reset
+
+            for handler, concurrent in list(self.subscribers.get(event, [])):
+                if concurrent:
+                    self.pool.submit(self.run_concurrent, generation, handler, self.blackboard.snapshot(), data)
+                else:
+                    handler(**data)
+
+    def run_concurrent(self, generation, handler, snapshot, data):
+        try:
+            result = handler(snapshot, **data)
+        except Exception:
+            traceback.print_exc()  # a future's exception would otherwise go unseen
+            return
+        if result is not None:
+            event, result_data = result
+            self.events.put((generation, event, result_data))
+
+    def reset(self):
+        """Start a new game: clear the blackboard and forget outstanding work."""
+        self.generation += 1
+        self.blackboard.reset()
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
@@ -1,26 +1,48 @@
 import tkinter as tk
-from MoveProcessor import MoveProcessor
-from MoveValidator import MoveValidator
-from PlayerManager import PlayerManager
-from WinCheck import WinChecker
-from MonteCarlo import MonteCarlo
+from Controller import MOVE_REQUESTED, MOVE_APPLIED, TURN_CHANGED, GAME_OVER
 
 class GameBoard(tk.Canvas):
-    def __init__(self, parent, blackboard, start_new_game_callback, restart_game_callback, app_ref):
+    def __init__(self, parent, blackboard, controller, start_new_game_callback, restart_game_callback, app_ref):
         super().__init__(parent)
         self.blackboard = blackboard
+        self.controller = controller
         self.start_new_game_callback = start_new_game_callback
         self.restart_game_callback = restart_game_callback
         self.app_ref = app_ref
         self.colors = self.blackboard.selected_colors if hasattr(self.blackboard, "selected_colors") else {}
+        self.waiting_for_winner = False
+        # cells shrink to keep larger boards within the default board area
+        self.cell_size = min(60, 420 // blackboard.columns, 360 // blackboard.rows)
+        # one oval per cell, created once; draw_board recolors only the cells
+        # that changed since the snapshot it last drew
+        self.cell_items = []
+        self.drawn = None
+        self.win_line = None
+        self.win_line_shown = False
 
         self.create_widgets()
 
+        # the board only redraws in response to blackboard events
+        self.handlers = {
+            MOVE_APPLIED: self.on_move_applied,
+            TURN_CHANGED: self.on_turn_changed,
+            GAME_OVER: self.on_game_over,
+        }
+        for event, handler in self.handlers.items():
+            self.controller.subscribe(event, handler)
+
+    def detach(self):
+        # stop reacting to events once the board is replaced
+        for event, handler in self.handlers.items():
+            self.controller.unsubscribe(event, handler)
+
     def create_widgets(self):
         bg_color = self.colors.get("background_color", "blue")
-        self.canvas = tk.Canvas(self, bg=bg_color, height=360, width=420)
+        self.canvas = tk.Canvas(self, bg=bg_color, height=self.blackboard.rows * self.cell_size,
+                                width=self.blackboard.columns * self.cell_size)
 
         self.canvas.pack(side=tk.LEFT, padx=(10, 0))
+        self.create_cells()
         self.draw_board()
 
         self.right_side_frame = tk.Frame(self)
@@ -41,95 +63,79 @@ class GameBoard(tk.Canvas):
         player_color = "player 1" if self.blackboard.current_player == 1 else "player 2"
         self.player_turn_label.config(text=f"{player_color}'s turn")
 
-    def draw_board(self, winning_positions=None):
-        self.canvas.delete("token")
-        self.update_idletasks() 
-
-        rows, cols = 6, 7
-        cell_size = 60  
-
-        for row in range(rows):
-            for col in range(cols):
+    def token_colors(self):
+        return {
+            0: self.colors.get("board_color", "white"),
+            1: self.colors.get("player1_color", "player 1"),
+            2: self.colors.get("player2_color", "player 2"),
+        }
+
+    def create_cells(self):
+        cell_size = self.cell_size
+        inset = cell_size // 6
+        colors = self.token_colors()
+        self.drawn = self.blackboard.snapshot()
+        for row in range(self.blackboard.rows):
+            items = []
+            for col in range(self.blackboard.columns):
                 x0, y0 = col * cell_size, row * cell_size
                 x1, y1 = x0 + cell_size, y0 + cell_size
-                color = "white"
-
-                if self.blackboard.board[row][col] == 1:
-                    color = self.colors.get("player1_color", "player 1")
-                elif self.blackboard.board[row][col] == 2:
-                    color = self.colors.get("player2_color", "player 2")
-                else:
-                    color = self.colors.get("board_color", "white")
+                items.append(self.canvas.create_oval(x0 + inset, y0 + inset, x1 - inset, y1 - inset,
+                                                     fill=colors[self.drawn.board[row][col]], tags="token"))
+            self.cell_items.append(items)
+        # the win line is an overlay above the cells, shown once the game is won
+        self.win_line = self.canvas.create_line(0, 0, 0, 0, fill="black", width=5, state=tk.HIDDEN)
 
-                self.canvas.create_oval(x0 + 10, y0 + 10, x1 - 10, y1 - 10, fill=color, tags="token")
+    def draw_board(self, winning_positions=None):
+        colors = self.token_colors()
+        for row, col, token in self.blackboard.changed_cells(self.drawn):
+            self.canvas.itemconfig(self.cell_items[row][col], fill=colors[token])
+        self.drawn = self.blackboard.snapshot()
 
         if winning_positions:
-            x0, y0 = winning_positions[0][1] * cell_size + 30, winning_positions[0][0] * cell_size + 30
-            x1, y1 = winning_positions[-1][1] * cell_size + 30, winning_positions[-1][0] * cell_size + 30
-            self.canvas.create_line(x0, y0, x1, y1, fill="black", width=5)
-        #  make sure that the board is refreshed
-        self.update_idletasks()  
+            cell_size = self.cell_size
+            center = cell_size // 2
+            x0, y0 = winning_positions[0][1] * cell_size + center, winning_positions[0][0] * cell_size + center
+            x1, y1 = winning_positions[-1][1] * cell_size + center, winning_positions[-1][0] * cell_size + center
+            self.canvas.coords(self.win_line, x0, y0, x1, y1)
+            self.canvas.itemconfig(self.win_line, state=tk.NORMAL)
+            self.win_line_shown = True
+        elif self.win_line_shown:
+            self.canvas.itemconfig(self.win_line, state=tk.HIDDEN)
+            self.win_line_shown = False
 
     def on_board_click(self, event):
-        if hasattr(self, "waiting_for_winner") and self.waiting_for_winner:
+        if self.waiting_for_winner:
             # output for debugging
             print("Click ignored: Waiting for winner screen to appear...")
             return
-        
-        column = event.x // 60
 
-        MV = MoveValidator(self.blackboard)
-        MP = MoveProcessor(self.blackboard, MV)
-        PM = PlayerManager(self.blackboard)
-        Win = WinChecker(self.blackboard)
+        # the AI moves on its own turn
+        if self.blackboard.opponent_type == "Monte Carlo AI" and self.blackboard.current_player == 2:
+            return
 
-        if MP.process_move(column):  
-            self.draw_board()  
+        column = event.x // self.cell_size
+        self.controller.publish(MOVE_REQUESTED, column=column, player=self.blackboard.current_player,
+                                move_count=self.blackboard.move_count)
+        self.controller.process_events()
 
-            winner, winning_positions = Win.check_winner()
-            if winner is not None:  
-                # prevent the user from clicking(choosing a column) if there is a winner and the line drawn but the win ui not redirected yet
-                self.waiting_for_winner = True  
-                self.draw_board(winning_positions if winning_positions else None)
-                # show winner and unlock clicks
-                self.after(2000, lambda: self.show_winner_and_unlock(winner))  
-                return
+    def on_move_applied(self, **move):
+        self.draw_board()
 
-            PM.switch_turns()
-            self.update_player_turn_label()
+    def on_turn_changed(self, player):
+        self.update_player_turn_label()
 
-            if self.blackboard.opponent_type == "Monte Carlo AI" and self.blackboard.current_player == 2:
-                self.after(500, self.ai_make_move)
+    def on_game_over(self, winner, positions):
+        # prevent the user from clicking(choosing a column) if there is a winner and the line drawn but the win ui not redirected yet
+        self.waiting_for_winner = True
+        self.draw_board(positions)
+        # show winner and unlock clicks
+        self.after(2000, lambda: self.show_winner_and_unlock(winner))
 
     def show_winner_and_unlock(self, winner):
         self.app_ref.show_winner(winner) 
         self.waiting_for_winner = False 
 
-    def ai_make_move(self):
-        if self.blackboard.opponent_type == "Monte Carlo AI":
-            MC = MonteCarlo(self.blackboard)
-            move = MC.find_best_move()
-
-            if move is None:
-                return  
-
-            MV = MoveValidator(self.blackboard)
-            MP = MoveProcessor(self.blackboard, MV)
-            PM = PlayerManager(self.blackboard)
-            Win = WinChecker(self.blackboard)
-
-            if MP.process_move(move):  
-                self.draw_board()  
-
-                winner, winning_positions = Win.check_winner()
-                if winner:
-                    self.draw_board(winning_positions)
-                    self.after(2000, lambda: self.app_ref.show_winner(winner))
-                    return
-
-                PM.switch_turns()
-                self.update_player_turn_label()
-
     def restart_game(self):
         self.restart_game_callback()
 
@@ -1,82 +1,113 @@
 import random
-import copy
+
+from Controller import MOVE_REQUESTED, TURN_CHANGED
 
 
 class MonteCarlo:
     def __init__(self, blackboard, simulations_per_move=100):
         self.blackboard = blackboard
         self.simulations_per_move = simulations_per_move
+        self.rows = blackboard.rows
+        self.columns = blackboard.columns
+        self.win_length = blackboard.win_length
+        # flat state layout: one byte per cell, column by column from the bottom
+        # row up, followed by one byte per column holding its number of tokens
+        self.heights = self.rows * self.columns
+        self.state_size = self.heights + self.columns
+
+    def register(self, controller):
+        controller.subscribe(TURN_CHANGED, self.on_turn_changed, concurrent=True)
+
+    def on_turn_changed(self, snapshot, player):
+        # runs on a worker thread once the last move has been checked
+        if snapshot.opponent_type != "Monte Carlo AI" or player != 2:
+            return None
+
+        move = self.find_best_move(snapshot)
+        if move is None:
+            return None
+        return MOVE_REQUESTED, {"column": move, "player": player, "move_count": snapshot.move_count}
 
-    def simulate_move(self, board, column, player):
-        """Simulate a move on the board, returning None if the column is full."""
-        if board[0][column] != 0:
+    def encode_board(self, board):
+        """Convert the blackboard's list-of-lists board (top row first) to a flat state."""
+        rows, heights = self.rows, self.heights
+        state = bytearray(self.state_size)
+        for col in range(self.columns):
+            for row in reversed(range(rows)):
+                if board[row][col] == 0:
+                    break
+                height = state[heights + col]
+                state[col * rows + height] = board[row][col]
+                state[heights + col] = height + 1
+        return state
+
+    def simulate_move(self, state, column, player):
+        """Simulate a move on the flat state, returning None if the column is full."""
+        height = state[self.heights + column]
+        if height == self.rows:
             return None
-        
-        for row in reversed(range(6)): 
-            if board[row][column] == 0:
-                board[row][column] = player
-                return row, column
-        return None
-
-    def simulate_random_playouts(self, board, player):
+
+        state[column * self.rows + height] = player
+        state[self.heights + column] = height + 1
+        return height, column
+
+    def simulate_random_playouts(self, state, player):
         """Simulate random playouts from the current state to determine the game's outcome."""
-        available_moves = [c for c in range(7) if board[0][c] == 0]
-        while True:
-            if not available_moves:
-                return 0  
-            move = random.choice(available_moves)
-            move_result = self.simulate_move(board, move, player)
-            if move_result is None:  # If the choosen column full find another move
-                available_moves.remove(move)
-                continue
-            row, col = move_result
-            if self.check_winner(board, row, col, player):  
+        available_moves = [c for c in range(self.columns) if state[self.heights + c] < self.rows]
+        while available_moves:
+            i = random.randrange(len(available_moves))
+            move = available_moves[i]
+            height, col = self.simulate_move(state, move, player)
+            if self.check_winner(state, height, col, player):
                 return player
+            if height == self.rows - 1:  # the column is full now, drop it from the choices
+                available_moves[i] = available_moves[-1]
+                available_moves.pop()
             player = 3 - player  # switch the player
+        return 0
 
-    def find_best_move(self):
+    def find_best_move(self, blackboard=None):
         """Find the best move using Monte Carlo simulation, avoiding full columns."""
-        original_player = self.blackboard.current_player
-        move_wins = {c: 0 for c in range(7) if self.blackboard.board[0][c] == 0} 
+        blackboard = blackboard or self.blackboard
+        original_player = blackboard.current_player
+        state = self.encode_board(blackboard.board)
+        move_wins = {c: 0 for c in range(self.columns) if state[self.heights + c] < self.rows}
 
         available_moves = list(move_wins.keys())
 
         if not available_moves:
-            return None 
+            return None
 
         for move in available_moves:
+            after_move = state[:]
+            self.simulate_move(after_move, move, original_player)
             for _ in range(self.simulations_per_move):
-                board_copy = copy.deepcopy(self.blackboard.board)
-                if self.simulate_move(board_copy, move, original_player) is None:
-                    continue 
-                winner = self.simulate_random_playouts(board_copy, 3 - original_player)
+                winner = self.simulate_random_playouts(after_move[:], 3 - original_player)
                 if winner == original_player:
                     move_wins[move] += 1
 
-        if not move_wins:
-            return None  # No valid moves found
-
         # choose the best move from available ones
         best_move = max(move_wins, key=move_wins.get)
         return best_move
 
-    def check_winner(self, board, row, col, player):
-        directions = [(0, 1), (1, 0), (1, 1), (1, -1)]  # Horizontal, Vertical, Diagonal Down, Diagonal Up
-        for d in directions:
+    def check_winner(self, state, height, col, player):
+        rows, columns, win_length = self.rows, self.columns, self.win_length
+        directions = [(0, 1), (1, 0), (1, 1), (1, -1)]  # Horizontal, Vertical, Diagonal Up, Diagonal Down
+        for dh, dc in directions:
             count = 1  # Include the current token
-            for i in range(1, 4):
-                r = row + d[0] * i
-                c = col + d[1] * i
-                if r < 0 or r >= len(board) or c < 0 or c >= len(board[0]) or board[r][c] != player:
+            for i in range(1, win_length):
+                h = height + dh * i
+                c = col + dc * i
+                if h < 0 or h >= rows or c < 0 or c >= columns or state[c * rows + h] != player:
                     break
                 count += 1
-            for i in range(1, 4):
-                r = row - d[0] * i
-                c = col - d[1] * i
-                if r < 0 or r >= len(board) or c < 0 or c >= len(board[0]) or board[r][c] != player:
+            for i in range(1, win_length):
+                h = height - dh * i
+                c = col - dc * i
+                if h < 0 or h >= rows or c < 0 or c >= columns or state[c * rows + h] != player:
                     break
                 count += 1
             # Check if player won
-            if count >= 4:
+            if count >= win_length:
                 return True
         return False
@@ -1,7 +1,41 @@
+from Controller import MOVE_REQUESTED, MOVE_APPLIED, WIN_CHECKED
+
+
 class MoveProcessor:
     def __init__(self, blackboard, move_validator):
         self.blackboard = blackboard
         self.move_validator = move_validator
+        self.controller = None
+        # request held until the win check of the previous move is done
+        self.waiting_request = None
+
+    def register(self, controller):
+        self.controller = controller
+        controller.subscribe(MOVE_REQUESTED, self.on_move_requested)
+        controller.subscribe(WIN_CHECKED, self.on_win_checked)
+
+    def on_move_requested(self, column, player, move_count):
+        board = self.blackboard
+        # drop requests made for an earlier position, out of turn or after the game ended
+        if move_count != board.move_count or player != board.current_player or board.winner is not None:
+            return
+
+        if board.checked_move_count != board.move_count:
+            self.waiting_request = (self.controller.generation, column, player, move_count)
+            return
+
+        if self.process_move(column):
+            row, _ = board.last_move
+            self.controller.publish(MOVE_APPLIED, row=row, column=column, player=player)
+
+    def on_win_checked(self, **result):
+        if self.waiting_request is None:
+            return
+        generation, column, player, move_count = self.waiting_request
+        self.waiting_request = None
+        if generation == self.controller.generation:
+            # published rather than handled here, so the win checker records the result first
+            self.controller.publish(MOVE_REQUESTED, column=column, player=player, move_count=move_count)
 
     def process_move(self, column):
         # check if the move valid
@@ -9,9 +43,12 @@ class MoveProcessor:
             return False
 
         # place the token if the slot is empty
-        for row in reversed(range(6)): 
-            if self.blackboard.board[row][column] == 0:  
-                self.blackboard.board[row][column] = self.blackboard.current_player  
+        board = self.blackboard.board
+        for row in reversed(range(len(board))): 
+            if board[row][column] == 0:  
+                # one new version with the token, recorded as the last move so
+                # the win checker only looks at lines through it
+                self.blackboard.place_token(row, column, self.blackboard.current_player)
                 return True
 
         return False
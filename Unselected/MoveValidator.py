@@ -4,11 +4,12 @@ class MoveValidator:
 
     def is_move_valid(self, column):
         # check if the choosen column is valid 
-        if column < 0 or column >= len(self.blackboard.board[0]):
+        board = self.blackboard.board
+        if column < 0 or column >= len(board[0]):
             return False
 
-        for row in range(len(self.blackboard.board) - 1, -1, -1):  
-            if self.blackboard.board[row][column] == 0:
+        for row in range(len(board) - 1, -1, -1):  
+            if board[row][column] == 0:
                 return True 
 
         return False  
@@ -1,3 +1,6 @@
+from Controller import WIN_CHECKED, TURN_CHANGED
+
+
 class PlayerManager:
     def __init__(self, blackboard):
         self.blackboard = blackboard
@@ -5,6 +8,19 @@ class PlayerManager:
         self.player_types = {1: 'human', 2: 'human'}
         # Initialize player tokens. Player 1 is red, Player 2 is yellow.
         self.player_tokens = {1: 'player 1', 2: 'player 2'}
+        self.controller = None
+
+    def register(self, controller):
+        self.controller = controller
+        controller.subscribe(WIN_CHECKED, self.on_win_checked)
+
+    def on_win_checked(self, move_count, winner, positions):
+        # the turn passes once the move is known not to end the game, so the
+        # winner stays the current player
+        if winner is not None:
+            return
+        self.switch_turns()
+        self.controller.publish(TURN_CHANGED, player=self.blackboard.current_player)
 
     def switch_turns(self):
         self.blackboard.current_player = 1 if self.blackboard.current_player == 2 else 2
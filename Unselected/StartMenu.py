@@ -1,5 +1,12 @@
 import tkinter as tk
 import random
+from collections import deque
+
+PARTICLE_POOL_SIZE = 96  # most particles on screen at once
+PARTICLE_FRAME_MS = 33  # frame-rate cap, about 30 frames per second
+PARTICLE_STEP = 2  # pixels fallen per frame
+PARTICLE_SPAWN_CHANCE = 0.3  # chance of a new particle each frame
+PARTICLE_PAUSED_MS = 250  # how often the hidden menu checks whether it is shown again
 
 class StartMenu(tk.Frame):
     def __init__(self, parent, start_game_callback, open_color_selector_callback=None):
@@ -11,7 +18,12 @@ class StartMenu(tk.Frame):
         self.canvas = tk.Canvas(self, width=500, height=500, bg="black", highlightthickness=0)
         self.canvas.pack(fill="both", expand=True)
 
-        self.particles = []
+        # particles are drawn from a pool of ovals created once and moved each
+        # frame, instead of deleting and recreating every oval per frame
+        self.free_particles = [self.canvas.create_oval(0, 0, 0, 0, outline="", state=tk.HIDDEN, tags="particles")
+                               for _ in range(PARTICLE_POOL_SIZE)]
+        self.falling_particles = deque()  # (item, frame spawned), oldest first
+        self.frame = 0
         self.animate_particles()
 
         self.title_label = tk.Label(self.parent, text="Connect-4", font=("Helvetica", 28, "bold"),
@@ -43,24 +55,30 @@ class StartMenu(tk.Frame):
         self.canvas.create_window(250, 260, window=self.start_button)
 
     def animate_particles(self):
-        self.canvas.delete("particles")
+        # the menu stays alive while a game is played, so it pauses while hidden
+        if not self.canvas.winfo_viewable():
+            self.after(PARTICLE_PAUSED_MS, self.animate_particles)
+            return
+
+        self.frame += 1
+        self.canvas.move("falling", 0, PARTICLE_STEP)
 
-        if random.random() < 0.3:
+        # every particle falls at the same speed, so the oldest leave the canvas first
+        while self.falling_particles and (self.frame - self.falling_particles[0][1]) * PARTICLE_STEP >= 500:
+            item, _ = self.falling_particles.popleft()
+            self.canvas.itemconfigure(item, state=tk.HIDDEN, tags="particles")
+            self.free_particles.append(item)
+
+        if self.free_particles and random.random() < PARTICLE_SPAWN_CHANCE:
+            item = self.free_particles.pop()
             x = random.randint(0, 500)
-            size = random.randint(2, 4)
-            color = random.choice(["#5555ff", "#7777ff", "#9999ff"])
-            self.particles.append([x, 0, size, color])
-
-        updated_particles = []
-        for x, y, r, color in self.particles:
-            y += 2
-            if y < 500:
-                self.canvas.create_oval(x - r, y - r, x + r, y + r,
-                                        fill=color, outline="", tags="particles")
-                updated_particles.append([x, y, r, color])
-
-        self.particles = updated_particles
-        self.after(30, self.animate_particles)
+            r = random.randint(2, 4)
+            self.canvas.coords(item, x - r, -r, x + r, r)
+            self.canvas.itemconfigure(item, fill=random.choice(["#5555ff", "#7777ff", "#9999ff"]),
+                                      state=tk.NORMAL, tags=("particles", "falling"))
+            self.falling_particles.append((item, self.frame))
+
+        self.after(PARTICLE_FRAME_MS, self.animate_particles)
 
     def on_start(self):
         opponent = self.opponent_var.get()
@@ -1,29 +1,55 @@
+from Controller import MOVE_APPLIED, WIN_CHECKED, GAME_OVER
+
+
 class WinChecker:
     def __init__(self, blackboard):
         self.blackboard = blackboard
+        self.controller = None
+
+    def register(self, controller):
+        self.controller = controller
+        controller.subscribe(MOVE_APPLIED, self.on_move_applied, concurrent=True)
+        controller.subscribe(WIN_CHECKED, self.on_win_checked)
+
+    def on_move_applied(self, snapshot, **move):
+        # runs on a worker thread with a snapshot of the blackboard
+        winner, positions = self.check_winner(snapshot)
+        return WIN_CHECKED, {"move_count": snapshot.move_count, "winner": winner, "positions": positions}
+
+    def on_win_checked(self, move_count, winner, positions):
+        # winner stays None while the game goes on
+        self.blackboard.update(checked_move_count=move_count, winner=winner, winning_positions=positions)
+        if winner is not None:
+            self.controller.publish(GAME_OVER, winner=winner, positions=positions)
+
+    def check_winner(self, blackboard=None):
+        blackboard = blackboard or self.blackboard
+        # only the last token placed can have completed a line
+        if blackboard.last_move is None:
+            return None, None
+
+        board = blackboard.board
+        rows, columns = len(board), len(board[0])
+        row, col = blackboard.last_move
+        player = board[row][col]
+        # horizontal, vertical, diagonal (down-right), diagonal (up-right)
+        for d_row, d_col in ((0, 1), (1, 0), (1, 1), (-1, 1)):
+            line = [(row, col)]
+            # extend the line backwards, then forwards, from the last token
+            for sign in (-1, 1):
+                r, c = row + sign * d_row, col + sign * d_col
+                while 0 <= r < rows and 0 <= c < columns and board[r][c] == player:
+                    if sign < 0:
+                        line.insert(0, (r, c))
+                    else:
+                        line.append((r, c))
+                    r, c = r + sign * d_row, c + sign * d_col
+            # check if player won
+            if len(line) >= self.blackboard.win_length:
+                return player, line
+
+        # check if every slot is filled, the game is draw
+        if blackboard.move_count == rows * columns:
+            return 0, None
 
-    def check_winner(self):
-        board = self.blackboard.board
-        for row in range(6):
-            for col in range(7):
-                player = board[row][col]
-                if player == 0:
-                    continue 
-                # check the horizontal win
-                if col + 3 < 7 and all(board[row][col + i] == player for i in range(4)):
-                    return player, [(row, col + i) for i in range(4)]
-                # check the vertical win
-                if row + 3 < 6 and all(board[row + i][col] == player for i in range(4)):
-                    return player, [(row + i, col) for i in range(4)]
-                # check the diagonal (down-right) win
-                if row + 3 < 6 and col + 3 < 7 and all(board[row + i][col + i] == player for i in range(4)):
-                    return player, [(row + i, col + i) for i in range(4)]
-                # check the diagonal (up-right) win
-                if row - 3 >= 0 and col + 3 < 7 and all(board[row - i][col + i] == player for i in range(4)):
-                    return player, [(row - i, col + i) for i in range(4)]
-
-        # check if there is no empty slots left, the game is  draw
-        if all(board[0][col] != 0 for col in range(7)):  
-            return 0, None  
-
-        return None, None  
+        return None, None